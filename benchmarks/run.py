@@ -0,0 +1,266 @@
+"""
+Latency/throughput benchmarks for every pipeline stage and the HTTP API.
+
+    python -m benchmarks.run                    # default sweep, compare with benchmarks/baseline.json
+    python -m benchmarks.run --profile quick    # base configuration only
+    python -m benchmarks.run --save-baseline    # record this run as the new baseline
+    python -m benchmarks.run --require-baseline # CI: a missing baseline is a failure too
+
+Each configuration (feature count x training rows) gets synthetic artifacts shaped like the
+pilot dataset (see synthetic.py, cached under --artifacts-dir), then every stage is timed at
+each batch size. Results are written as JSON; any stage whose latency (best per-round median)
+exceeds the baseline by more than --tolerance (and --min-delta-ms) is reported and the run
+exits with 1. Timings are machine-specific: record the baseline on the machine (or CI runner
+class) that runs the comparison; a warning is printed when the hardware or versions differ.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+# Add current dir to path
+sys.path.append(os.getcwd())
+
+from benchmarks.synthetic import BASE_FEATURES, BASE_ROWS, build_artifacts, query_rows
+
+# Sweeps vary one axis at a time around the pilot shape (30 features, 569 rows)
+PROFILES = {
+    "quick": {"features": [BASE_FEATURES], "train_rows": [BASE_ROWS], "batch_sizes": [1, 64]},
+    "default": {"features": [10, BASE_FEATURES, 100], "train_rows": [BASE_ROWS, 5000, 50000], "batch_sizes": [1, 16, 256]},
+}
+
+def measure(fn: Callable[[], Any], rows: int, min_time: float = 0.5, rounds: int = 5,
+            max_repeats: int = 2000, warmup: int = 3) -> Dict[str, float]:
+    """
+    Runs `fn` repeatedly (after `warmup` calls) for at least `min_time` seconds, split into
+    `rounds`. `best_median_ms`, the lowest per-round median, is what baselines are compared
+    on: it filters out rounds slowed down by other load on the machine.
+    """
+    for _ in range(warmup):
+        fn()
+    samples, round_medians = [], []
+    for _ in range(rounds):
+        round_samples = []
+        deadline = time.perf_counter() + min_time / rounds
+        while len(round_samples) < max_repeats // rounds and (len(round_samples) < 3 or time.perf_counter() < deadline):
+            start = time.perf_counter()
+            fn()
+            round_samples.append((time.perf_counter() - start) * 1000.0)
+        samples.extend(round_samples)
+        round_medians.append(float(np.median(round_samples)))
+    samples = np.array(samples)
+    best = min(round_medians)
+    return {
+        "best_median_ms": round(best, 4),
+        "median_ms": round(float(np.median(samples)), 4),
+        "p95_ms": round(float(np.percentile(samples, 95)), 4),
+        "mean_ms": round(float(samples.mean()), 4),
+        "repeats": len(samples),
+        "rows_per_s": round(rows / best * 1000.0, 1)
+    }
+
+def stage_benchmarks(profiler_path: str, model_dir: str, batch_size: int, num_features: int, num_rows: int,
+                     log_dir: str, min_time: float) -> Dict[str, Dict[str, float]]:
+    from core.trust.pipeline import TrustPipeline
+    from infrastructure.mlops.logger import TrustLogger
+    from infrastructure import encoding
+
+    pipeline = TrustPipeline.from_artifacts(profiler_path, model_dir)
+    X = query_rows(batch_size, num_features, num_rows)
+    estimator = pipeline.estimator
+
+    predictions = pipeline.model_manager.predict_all(X)
+    assessment = pipeline.assess_batch(X)
+    records = [dict(zip(pipeline.feature_names, row)) for row in X.tolist()]
+    rows = assessment.rows()
+    logger = TrustLogger(log_dir)
+
+    stages = {
+        "predict_all": lambda: pipeline.model_manager.predict_all(X),
+        "mc_dropout": lambda: estimator.get_mc_dropout_uncertainty_batch(X, 50),
+        "compute_similarity": lambda: pipeline.profiler.compute_similarity_batch(X),
+        "compute_trust_score": lambda: pipeline.trust_engine.score_batch(assessment.uncertainty),
+        "render_reports": lambda: assessment.rows(),
+        "log_decision": lambda: logger.log_decisions(records, [r["prediction"] for r in rows], [r["trust"] for r in rows]),
+        # Successor of deep_clean: encoding the rendered response
+        "encode_response": lambda: encoding.dumps({"prediction": predictions, "results": rows}),
+        "assess_batch": lambda: pipeline.assess_batch(X),
+    }
+    results = {name: measure(fn, batch_size, min_time) for name, fn in stages.items()}
+    logger.close()
+    return results
+
+def api_benchmarks(profiler_path: str, model_dir: str, batch_sizes: List[int], work_dir: str,
+                   mode: str, min_time: float) -> Dict[int, Dict[str, Dict[str, float]]]:
+    """
+    End-to-end /assess and /assess/batch through a local ASGI test client.
+    """
+    from fastapi.testclient import TestClient
+    from infrastructure.config import settings
+
+    settings.PROFILER_PATH = profiler_path
+    settings.MODEL_DIR = model_dir
+    settings.LOG_DIR = os.path.join(work_dir, "api_logs")
+    settings.CALIBRATION_STATE_PATH = os.path.join(work_dir, "calibration.json")
+    settings.INFERENCE_MODE = mode
+    from infrastructure.api.main import app, state
+
+    results = {}
+    with TestClient(app) as client:
+        deadline = time.time() + 300
+        while client.get("/health").status_code != 200:
+            if state["startup_error"] or time.time() > deadline:
+                raise RuntimeError(f"API failed to start: {state['startup_error']}")
+            time.sleep(0.05)
+
+        feature_names = state["feature_names"]
+        for batch_size in batch_sizes:
+            X = query_rows(batch_size, len(feature_names))
+            records = [dict(zip(feature_names, row)) for row in X.tolist()]
+
+            def assess():
+                response = client.post("/assess", json={"features": records[0]})
+                assert response.status_code == 200, response.text
+
+            def assess_batch():
+                response = client.post("/assess/batch", json={"records": records})
+                assert response.status_code == 200, response.text
+
+            results[batch_size] = {"api_assess_batch": measure(assess_batch, batch_size, min_time)}
+            if batch_size == 1:
+                results[batch_size]["api_assess"] = measure(assess, 1, min_time)
+    return results
+
+def result_key(stage: str, num_features: int, num_rows: int, batch_size: int) -> str:
+    return f"{stage}|features={num_features}|train_rows={num_rows}|batch={batch_size}"
+
+def metadata(profile: str) -> Dict[str, Any]:
+    import torch
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = None
+    return {
+        "profile": profile,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "torch": torch.__version__,
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "torch_threads": torch.get_num_threads()
+    }
+
+def run(profile: str, artifacts_dir: str, min_time: float, api_mode: str, skip_api: bool) -> Dict[str, Any]:
+    import torch
+
+    torch.manual_seed(0)
+    sweep = PROFILES[profile]
+    configs = [(f, BASE_ROWS) for f in sweep["features"]] + [(BASE_FEATURES, n) for n in sweep["train_rows"] if n != BASE_ROWS]
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="trustscope-bench-") as work_dir:
+        for num_features, num_rows in configs:
+            profiler_path, model_dir = build_artifacts(artifacts_dir, num_features, num_rows)
+            for batch_size in sweep["batch_sizes"]:
+                print(f"[Benchmark] features={num_features} train_rows={num_rows} batch={batch_size}")
+                stages = stage_benchmarks(profiler_path, model_dir, batch_size, num_features, num_rows,
+                                          os.path.join(work_dir, "logs"), min_time)
+                for stage, stats in stages.items():
+                    results[result_key(stage, num_features, num_rows, batch_size)] = stats
+
+        if not skip_api:
+            print(f"[Benchmark] API end-to-end ({api_mode} mode)")
+            profiler_path, model_dir = build_artifacts(artifacts_dir, BASE_FEATURES, BASE_ROWS)
+            api = api_benchmarks(profiler_path, model_dir, sweep["batch_sizes"], work_dir, api_mode, min_time)
+            for batch_size, stages in api.items():
+                for stage, stats in stages.items():
+                    results[result_key(stage, BASE_FEATURES, BASE_ROWS, batch_size)] = stats
+
+    return {"meta": metadata(profile), "results": results}
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float, min_delta_ms: float) -> List[str]:
+    """
+    Prints current vs baseline latencies (best round medians) and returns the regressed keys.
+    """
+    base_meta, meta = baseline["meta"], current["meta"]
+    for field in ("machine", "cpu_count", "python", "torch"):
+        if base_meta.get(field) != meta.get(field):
+            print(f"[Benchmark] WARNING: baseline was recorded with {field}={base_meta.get(field)} "
+                  f"(now {meta.get(field)}); timings may not be comparable.")
+
+    regressions = []
+    print(f"{'stage':<75} {'baseline ms':>12} {'current ms':>12} {'ratio':>7}")
+    for key, stats in current["results"].items():
+        base = baseline["results"].get(key)
+        if base is None:
+            print(f"{key:<75} {'-':>12} {stats['best_median_ms']:>12.4f} {'new':>7}")
+            continue
+        ratio = stats["best_median_ms"] / base["best_median_ms"]
+        regressed = ratio > 1 + tolerance and stats["best_median_ms"] - base["best_median_ms"] > min_delta_ms
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{key:<75} {base['best_median_ms']:>12.4f} {stats['best_median_ms']:>12.4f} {ratio:>7.2f}{flag}")
+        if regressed:
+            regressions.append(key)
+    missing = [key for key in baseline["results"] if key not in current["results"]]
+    if missing and meta.get("profile") == base_meta.get("profile"):
+        print(f"[Benchmark] {len(missing)} baseline entries were not measured: {missing}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="TRUSTSCOPE stage and end-to-end benchmarks.")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="default")
+    parser.add_argument("--output", default="benchmarks/results/latest.json")
+    parser.add_argument("--baseline", default="benchmarks/baseline.json")
+    parser.add_argument("--save-baseline", action="store_true", help="Write this run to --baseline instead of comparing")
+    parser.add_argument("--require-baseline", action="store_true",
+                        help="Exit with 2 if --baseline does not exist (so CI cannot pass without comparing)")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown (0.25 = 25%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=0.05, help="Ignore slowdowns smaller than this (timer noise)")
+    parser.add_argument("--min-time", type=float, default=0.5, help="Seconds spent timing each stage")
+    parser.add_argument("--torch-threads", type=int, default=1)
+    parser.add_argument("--api-mode", choices=["thread", "inline", "process"], default="thread")
+    parser.add_argument("--skip-api", action="store_true")
+    parser.add_argument("--artifacts-dir", default=os.path.join(tempfile.gettempdir(), "trustscope-bench-artifacts"))
+    args = parser.parse_args()
+
+    import torch
+    torch.set_num_threads(args.torch_threads)
+
+    report = run(args.profile, args.artifacts_dir, args.min_time, args.api_mode, args.skip_api)
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"[Benchmark] Results written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"[Benchmark] Baseline saved to {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        print(f"[Benchmark] No baseline at {args.baseline}; run with --save-baseline to create one.")
+        if args.require_baseline:
+            print("[Benchmark] FAILED: --require-baseline is set and there is nothing to compare against.")
+            sys.exit(2)
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(report, baseline, args.tolerance, args.min_delta_ms)
+    if regressions:
+        print(f"[Benchmark] FAILED: {len(regressions)} regression(s) beyond {args.tolerance:.0%}: {regressions}")
+        sys.exit(1)
+    print("[Benchmark] No regressions against the baseline.")
+
+if __name__ == "__main__":
+    main()
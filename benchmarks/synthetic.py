@@ -0,0 +1,65 @@
+import os
+import numpy as np
+from typing import TYPE_CHECKING, Tuple
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Shape of the pilot dataset (sklearn's load_breast_cancer)
+BASE_FEATURES = 30
+BASE_ROWS = 569
+
+def make_dataset(num_features: int = BASE_FEATURES, num_rows: int = BASE_ROWS, seed: int = 0) -> Tuple["pd.DataFrame", np.ndarray]:
+    """
+    Synthetic binary classification data shaped like the breast cancer set: strictly positive,
+    correlated features on very different scales (roughly 1e-2 to 1e3), ~63/37 class balance.
+    """
+    import pandas as pd
+    from sklearn.datasets import make_classification
+
+    X, y = make_classification(
+        n_samples=num_rows,
+        n_features=num_features,
+        n_informative=max(2, num_features // 3),
+        n_redundant=max(0, num_features // 3),
+        weights=[0.37],
+        random_state=seed
+    )
+    rng = np.random.default_rng(seed)
+    scales = 10.0 ** rng.uniform(-2, 3, num_features)
+    X = (X - X.min(axis=0) + 0.1) * scales
+    columns = [f"feature_{i}" for i in range(num_features)]
+    return pd.DataFrame(X, columns=columns), y
+
+def build_artifacts(root: str, num_features: int = BASE_FEATURES, num_rows: int = BASE_ROWS, seed: int = 0) -> Tuple[str, str]:
+    """
+    Fits a profiler and trains the ensemble on synthetic data under `root`, reusing artifacts
+    from an earlier run with the same shape. Returns (profiler_path, model_dir).
+    """
+    import torch
+    from core.data_science.profiler import DataProfiler
+    from core.modeling.models import TrustModelManager
+
+    config_dir = os.path.join(root, f"f{num_features}_n{num_rows}_s{seed}")
+    profiler_path = os.path.join(config_dir, "profiler.joblib")
+    model_dir = os.path.join(config_dir, "models")
+    if os.path.exists(profiler_path) and os.path.exists(os.path.join(model_dir, "nn_model.pth")):
+        return profiler_path, model_dir
+
+    os.makedirs(config_dir, exist_ok=True)
+    X, y = make_dataset(num_features, num_rows, seed)
+    profiler = DataProfiler()
+    profiler.fit_distribution(X)
+    profiler.save(profiler_path)
+
+    torch.manual_seed(seed)
+    manager = TrustModelManager(input_dim=num_features, model_dir=model_dir)
+    manager.train(X.values, y)
+    return profiler_path, model_dir
+
+def query_rows(batch_size: int, num_features: int = BASE_FEATURES, num_rows: int = BASE_ROWS, seed: int = 0) -> np.ndarray:
+    """
+    Rows to score from the same generator (and feature scales) as the training data.
+    """
+    X, _ = make_dataset(num_features, num_rows + batch_size, seed)
+    return X.values[-batch_size:]
@@ -1,67 +1,136 @@
 import numpy as np
-from sklearn.metrics import brier_score_loss
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterable, List, Tuple
+
+class CalibrationAccumulator:
+    """
+    Per-bin sufficient statistics for calibration metrics: counts, summed confidence and
+    summed outcomes per bin, plus the totals needed for the Brier score.
+
+    `update` bins a chunk with one `np.digitize` and three `np.bincount` calls, so memory is
+    O(num_bins) however many predictions stream through, and accumulators built on separate
+    chunks can be combined with `merge`. Bins are right-closed, (lo, hi]; a probability of
+    exactly 0 falls in no bin but still counts towards N and the Brier score.
+    """
+
+    def __init__(self, num_bins: int = 10):
+        self.num_bins = num_bins
+        self.bin_boundaries = np.linspace(0, 1, num_bins + 1)
+        self.counts = np.zeros(num_bins)
+        self.sum_probs = np.zeros(num_bins)
+        self.sum_true = np.zeros(num_bins)
+        self.total = 0
+        self.total_probs = 0.0
+        self.total_true = 0.0
+        self.squared_error = 0.0
+
+    def update(self, y_true: np.ndarray, y_probs: np.ndarray) -> "CalibrationAccumulator":
+        y_true = np.asarray(y_true, dtype=float).ravel()
+        y_probs = np.asarray(y_probs, dtype=float).ravel()
+
+        # Bin i holds boundaries[i] < p <= boundaries[i + 1]; p == 0 maps to -1 (no bin)
+        bins = np.digitize(y_probs, self.bin_boundaries, right=True) - 1
+        in_bin = bins >= 0
+        bins = bins[in_bin]
+        self.counts += np.bincount(bins, minlength=self.num_bins)
+        self.sum_probs += np.bincount(bins, weights=y_probs[in_bin], minlength=self.num_bins)
+        self.sum_true += np.bincount(bins, weights=y_true[in_bin], minlength=self.num_bins)
+
+        self.total += len(y_probs)
+        self.total_probs += float(y_probs.sum())
+        self.total_true += float(y_true.sum())
+        self.squared_error += float(np.dot(y_probs - y_true, y_probs - y_true))
+        return self
+
+    def merge(self, other: "CalibrationAccumulator") -> "CalibrationAccumulator":
+        if other.num_bins != self.num_bins:
+            raise ValueError("Cannot merge accumulators with different bin counts.")
+        self.counts += other.counts
+        self.sum_probs += other.sum_probs
+        self.sum_true += other.sum_true
+        self.total += other.total
+        self.total_probs += other.total_probs
+        self.total_true += other.total_true
+        self.squared_error += other.squared_error
+        return self
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        ECE, MCE, Brier score and the reliability curve from the accumulated statistics.
+        """
+        occupied = self.counts > 0
+        counts = self.counts[occupied]
+        confidence = self.sum_probs[occupied] / counts
+        accuracy = self.sum_true[occupied] / counts
+        gaps = np.abs(accuracy - confidence)
+
+        return {
+            'ece': float(np.dot(counts, gaps) / self.total) if self.total else 0.0,
+            'mce': float(gaps.max()) if gaps.size else 0.0,
+            'brier_score': self.squared_error / self.total if self.total else 0.0,
+            'mean_confidence': self.total_probs / self.total if self.total else 0.0,
+            'mean_outcome': self.total_true / self.total if self.total else 0.0,
+            'reliability_curve': [
+                {'bin': int(i), 'confidence': float(c), 'accuracy': float(a), 'count': int(n)}
+                for i, c, a, n in zip(np.flatnonzero(occupied), confidence, accuracy, counts)
+            ]
+        }
 
 class TrustCalibrator:
     """
     Assesses how well model probabilities match reality.
-    
+
     Why this matters for Trust:
     Raw probabilities are often overconfident (e.g., model says 99% but is wrong 20% of the time).
     Calibration allows us to 'deflate' trust when a model is known to be overconfident.
     """
-    
+
     def __init__(self, num_bins: int = 10):
         self.num_bins = num_bins
 
+    def accumulator(self) -> CalibrationAccumulator:
+        return CalibrationAccumulator(self.num_bins)
+
     def calculate_ece(self, y_true: np.ndarray, y_probs: np.ndarray) -> float:
         """
         Calculates Expected Calibration Error (ECE).
         Weighted average of the difference between accuracy and confidence per bin.
         """
-        bin_boundaries = np.linspace(0, 1, self.num_bins + 1)
-        ece = 0.0
-        
-        for i in range(self.num_bins):
-            bin_mask = (y_probs > bin_boundaries[i]) & (y_probs <= bin_boundaries[i+1])
-            if np.sum(bin_mask) > 0:
-                bin_acc = np.mean(y_true[bin_mask])
-                bin_conf = np.mean(y_probs[bin_mask])
-                ece += np.sum(bin_mask) * np.abs(bin_acc - bin_conf)
-                
-        return float(ece / len(y_probs))
+        return self.accumulator().update(y_true, y_probs).metrics()['ece']
 
     def evaluate_calibration(self, y_true: np.ndarray, y_probs: np.ndarray) -> Dict[str, Any]:
         """
         Aggregates calibration metrics.
         """
-        ece = self.calculate_ece(y_true, y_probs)
-        brier = brier_score_loss(y_true, y_probs)
-        
+        return self.summarize(self.accumulator().update(y_true, y_probs))
+
+    def evaluate_calibration_stream(self, chunks: Iterable[Tuple[np.ndarray, np.ndarray]]) -> Dict[str, Any]:
+        """
+        Same as `evaluate_calibration` over an iterable of (y_true, y_probs) chunks,
+        e.g. logged predictions read in batches; only per-bin totals are kept in memory.
+        """
+        accumulator = self.accumulator()
+        for y_true, y_probs in chunks:
+            accumulator.update(y_true, y_probs)
+        return self.summarize(accumulator)
+
+    def summarize(self, accumulator: CalibrationAccumulator) -> Dict[str, Any]:
+        metrics = accumulator.metrics()
+        ece = metrics['ece']
+
         # Heuristic: If ECE > 0.1, the model is significantly miscalibrated
         calibration_quality = 1.0 - min(ece * 5, 1.0) # Scale it for trust logic
-        
+
         return {
             'ece': round(ece, 4),
-            'brier_score': round(float(brier), 4),
+            'mce': round(metrics['mce'], 4),
+            'brier_score': round(metrics['brier_score'], 4),
             'calibration_trust_factor': round(float(calibration_quality), 4),
-            'is_overconfident': ece > 0.1 and np.mean(y_probs) > np.mean(y_true)
+            'is_overconfident': bool(ece > 0.1 and metrics['mean_confidence'] > metrics['mean_outcome']),
+            'count': accumulator.total
         }
 
     def get_reliability_curve(self, y_true: np.ndarray, y_probs: np.ndarray) -> List[Dict[str, float]]:
         """
         Returns data points for a reliability curve (calibration plot).
         """
-        bin_boundaries = np.linspace(0, 1, self.num_bins + 1)
-        curve = []
-        
-        for i in range(self.num_bins):
-            bin_mask = (y_probs > bin_boundaries[i]) & (y_probs <= bin_boundaries[i+1])
-            if np.sum(bin_mask) > 0:
-                curve.append({
-                    'bin': i,
-                    'confidence': float(np.mean(y_probs[bin_mask])),
-                    'accuracy': float(np.mean(y_true[bin_mask])),
-                    'count': int(np.sum(bin_mask))
-                })
-        return curve
+        return self.accumulator().update(y_true, y_probs).metrics()['reliability_curve']
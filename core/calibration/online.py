@@ -0,0 +1,121 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+import numpy as np
+
+from core.calibration.calibrator import CalibrationAccumulator, TrustCalibrator
+
+class OnlineCalibrator:
+    """
+    Live calibration from delayed ground truth.
+
+    Each served assessment registers its ensemble probability under its assessment id
+    (`record`). When the true label arrives (`feedback`), the pair is added to a
+    CalibrationAccumulator and the ECE-derived `calibration_trust_factor` is refreshed, so
+    reading `trust_factor` on the request path is O(1). The factor stays None until
+    `min_labels` labels have been seen; until then trust scores are computed without it.
+
+    Pending probabilities are kept for at most `max_pending` assessments (oldest dropped).
+    The accumulator state can be saved to / restored from a small JSON file.
+    """
+
+    def __init__(self, num_bins: int = 10, min_labels: int = 200, max_pending: int = 100000,
+                 state_path: Optional[str] = None):
+        self.calibrator = TrustCalibrator(num_bins)
+        self.accumulator = CalibrationAccumulator(num_bins)
+        self.min_labels = min_labels
+        self.max_pending = max_pending
+        self.state_path = state_path
+
+        self._pending: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._summary = None
+        self.trust_factor: Optional[float] = None
+
+        # Metrics
+        self.unknown_feedback = 0
+        self.dropped_pending = 0
+
+        if state_path and os.path.exists(state_path):
+            self._load(state_path)
+
+    def record(self, assessment_id: str, probability: float):
+        with self._lock:
+            self._pending[assessment_id] = float(probability)
+            while len(self._pending) > self.max_pending:
+                self._pending.popitem(last=False)
+                self.dropped_pending += 1
+
+    def feedback(self, assessment_id: str, label: int) -> bool:
+        """
+        Adds the true label for an assessment. Returns False if the id is unknown,
+        already labelled or expired from the pending window.
+        """
+        with self._lock:
+            probability = self._pending.pop(assessment_id, None)
+            if probability is None:
+                self.unknown_feedback += 1
+                return False
+            self.accumulator.update(np.array([label]), np.array([probability]))
+            self._refresh()
+            return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            metrics = self.accumulator.metrics()
+            return {
+                "labels": self.accumulator.total,
+                "min_labels": self.min_labels,
+                "active": self.trust_factor is not None,
+                "calibration_trust_factor": self.trust_factor,
+                "summary": self._summary,
+                "reliability_curve": metrics["reliability_curve"],
+                "pending": len(self._pending),
+                "dropped_pending": self.dropped_pending,
+                "unknown_feedback": self.unknown_feedback
+            }
+
+    def save(self, path: Optional[str] = None):
+        path = path or self.state_path
+        if not path:
+            return
+        with self._lock:
+            acc = self.accumulator
+            state = {
+                "num_bins": acc.num_bins,
+                "counts": acc.counts.tolist(),
+                "sum_probs": acc.sum_probs.tolist(),
+                "sum_true": acc.sum_true.tolist(),
+                "total": acc.total,
+                "total_probs": acc.total_probs,
+                "total_true": acc.total_true,
+                "squared_error": acc.squared_error
+            }
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp, path)
+
+    def _load(self, path: str):
+        with open(path) as f:
+            state = json.load(f)
+        if state["num_bins"] != self.accumulator.num_bins:
+            print(f"[OnlineCalibrator] Ignoring {path}: saved with {state['num_bins']} bins.")
+            return
+        acc = self.accumulator
+        acc.counts = np.array(state["counts"], dtype=float)
+        acc.sum_probs = np.array(state["sum_probs"], dtype=float)
+        acc.sum_true = np.array(state["sum_true"], dtype=float)
+        acc.total = int(state["total"])
+        acc.total_probs = float(state["total_probs"])
+        acc.total_true = float(state["total_true"])
+        acc.squared_error = float(state["squared_error"])
+        self._refresh()
+
+    def _refresh(self):
+        self._summary = self.calibrator.summarize(self.accumulator)
+        if self.accumulator.total >= self.min_labels:
+            self.trust_factor = self._summary["calibration_trust_factor"]
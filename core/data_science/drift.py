@@ -0,0 +1,218 @@
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional
+
+import numpy as np
+
+def bin_index(X: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    """
+    Bin of every value of X (N x features) given per-feature inner edges (features x bins-1).
+    Bin b holds edges[b-1] <= x < edges[b]; duplicate edges (ties) leave empty bins.
+    """
+    return (X[:, :, None] >= edges[None]).sum(axis=2)
+
+def bin_fractions(X: np.ndarray, edges: np.ndarray, weights: np.ndarray = None) -> np.ndarray:
+    """
+    Fraction of the (optionally weighted) rows of X falling in each bin, as (features x bins).
+    """
+    num_features, num_bins = edges.shape[0], edges.shape[1] + 1
+    bins = bin_index(X, edges) + np.arange(num_features) * num_bins
+    if weights is not None:
+        weights = np.repeat(weights, num_features)
+    counts = np.bincount(bins.ravel(), weights=weights, minlength=num_features * num_bins)
+    counts = counts.reshape(num_features, num_bins)
+    return counts / counts.sum(axis=1, keepdims=True)
+
+def reference_bins(X: np.ndarray, num_bins: int = 10, weights: np.ndarray = None) -> Dict[str, np.ndarray]:
+    """
+    Quantile bin edges of the training data and the exact share of training rows in each bin
+    (not simply 1/num_bins, so discrete features with ties are handled).
+    """
+    qs = np.linspace(0, 1, num_bins + 1)[1:-1]
+    if weights is None:
+        edges = np.quantile(X, qs, axis=0).T
+    else:
+        order = np.argsort(X, axis=0)
+        cum_weights = np.cumsum(weights[order], axis=0)
+        idx = (cum_weights[:, None, :] < qs[None, :, None] * cum_weights[-1]).sum(axis=0)
+        edges = np.take_along_axis(X, order, axis=0)[np.minimum(idx, len(X) - 1), np.arange(X.shape[1])].T
+    return {"edges": edges, "proportions": bin_fractions(X, edges, weights)}
+
+class DriftWindow:
+    """
+    Sketch of one window of live traffic: per-feature bin counts plus the feature sums.
+    Updating costs O(rows * features * bins) and memory is O(features * bins).
+    """
+
+    def __init__(self, num_features: int, num_bins: int):
+        self.counts = np.zeros((num_features, num_bins))
+        self.sums = np.zeros(num_features)
+        self.rows = 0
+        self.started = time.time()
+
+    def update(self, X: np.ndarray, edges: np.ndarray):
+        num_features, num_bins = self.counts.shape
+        bins = bin_index(X, edges) + np.arange(num_features) * num_bins
+        self.counts += np.bincount(bins.ravel(), minlength=self.counts.size).reshape(self.counts.shape)
+        self.sums += X.sum(axis=0)
+        self.rows += X.shape[0]
+
+class DriftMonitor:
+    """
+    Streaming drift detection over the assessed inputs.
+
+    Incoming rows are added to a tumbling window sketch (`update`, O(features) per row). When a
+    window closes (`window_size` rows or `window_seconds`), it is compared with the training
+    profile on a background thread:
+      - PSI and a binned Kolmogorov-Smirnov test per feature, against the training quantile bins;
+      - a mean-shift test of the window mean in the profiler's whitened space, i.e. a
+        linear-kernel MMD scaled by the training covariance: n * d^2 ~ chi2(features).
+    A window is flagged when any feature's PSI exceeds `psi_threshold`, a KS p-value falls
+    below `p_value / features` (Bonferroni), or the mean-shift p-value falls below `p_value`.
+    The last `history` window reports and alerts are kept in memory.
+
+    `reference` comes from `DataProfiler.drift_reference()` and holds only numpy arrays, so the
+    monitor can run in a process that never loads the profiler.
+    """
+
+    def __init__(self,
+                 reference: Dict[str, Any],
+                 window_size: int = 500,
+                 window_seconds: float = 0,
+                 psi_threshold: float = 0.2,
+                 p_value: float = 0.01,
+                 min_rows: int = 100,
+                 history: int = 24):
+        self.feature_names = list(reference["feature_names"])
+        self.edges = np.asarray(reference["edges"], dtype=float)
+        self.proportions = np.asarray(reference["proportions"], dtype=float)
+        self.offset = np.asarray(reference["offset"], dtype=float)
+        self.whitening = np.asarray(reference["whitening"], dtype=float)
+        self.num_features, self.num_bins = self.proportions.shape
+
+        self.window_size = window_size
+        self.window_seconds = window_seconds
+        self.psi_threshold = psi_threshold
+        self.p_value = p_value
+        self.min_rows = min_rows
+
+        self.reports = deque(maxlen=history)
+        self.alerts = deque(maxlen=history)
+        self._window = DriftWindow(self.num_features, self.num_bins)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="trustscope-drift")
+        self.logger = logging.getLogger("TrustScope")
+
+        # Metrics
+        self.rows_seen = 0
+        self.windows_closed = 0
+        self.windows_skipped = 0
+
+    def update(self, X_input: np.ndarray):
+        """
+        Adds assessed rows to the current window. Closed windows are evaluated asynchronously.
+        """
+        X = np.asarray(X_input, dtype=float).reshape(-1, self.num_features)
+        with self._lock:
+            self._window.update(X, self.edges)
+            self.rows_seen += X.shape[0]
+            window = self._window
+            expired = self.window_seconds and time.time() - window.started >= self.window_seconds
+            if window.rows < self.window_size and not expired:
+                return
+            self._window = DriftWindow(self.num_features, self.num_bins)
+            self.windows_closed += 1
+
+        if window.rows < self.min_rows:
+            self.windows_skipped += 1
+            return
+        self._executor.submit(self._record, window)
+
+    def evaluate(self, window: DriftWindow) -> Dict[str, Any]:
+        """
+        PSI, KS and mean-shift results for one window.
+        """
+        from scipy.special import chdtrc, kolmogorov
+
+        n = window.rows
+        actual = window.counts / n
+        expected = self.proportions
+
+        # PSI; window bins are smoothed (+0.5 rows each) so a bin left empty by a small window
+        # does not dominate, and empty training bins are floored to stay finite
+        a = (window.counts + 0.5) / (n + 0.5 * self.num_bins)
+        e = np.maximum(expected, 1e-4)
+        psi = ((a - e) * np.log(a / e)).sum(axis=1)
+
+        # KS statistic on the bin edges (a lower bound on the exact statistic, so conservative)
+        ks = np.abs(np.cumsum(actual - expected, axis=1)[:, :-1]).max(axis=1)
+        ks_p = kolmogorov(np.sqrt(n) * ks)
+
+        # Window mean vs training mean in whitened space (identity covariance)
+        whitened = (window.sums / n - self.offset) @ self.whitening
+        mean_shift = float(n * whitened @ whitened)
+        mean_shift_p = float(chdtrc(self.num_features, mean_shift))
+
+        drifted = (psi > self.psi_threshold) | (ks_p < self.p_value / self.num_features)
+        features = {
+            name: {'psi': round(float(psi[i]), 4), 'ks_statistic': round(float(ks[i]), 4),
+                   'ks_p_value': round(float(ks_p[i]), 6), 'drifted': bool(drifted[i])}
+            for i, name in enumerate(self.feature_names)
+        }
+        return {
+            'window_start': window.started,
+            'window_end': time.time(),
+            'rows': n,
+            'features': features,
+            'drifted_features': [name for name, d in zip(self.feature_names, drifted) if d],
+            'mean_shift': {'statistic': round(mean_shift, 4), 'p_value': round(mean_shift_p, 6)},
+            'alert': bool(drifted.any() or mean_shift_p < self.p_value)
+        }
+
+    def evaluate_current(self) -> Optional[Dict[str, Any]]:
+        """
+        Evaluates the still-open window (None while it holds fewer than `min_rows` rows).
+        """
+        with self._lock:
+            window = self._window
+            if window.rows < self.min_rows:
+                return None
+            snapshot = DriftWindow(self.num_features, self.num_bins)
+            snapshot.counts, snapshot.sums = window.counts.copy(), window.sums.copy()
+            snapshot.rows, snapshot.started = window.rows, window.started
+        return self.evaluate(snapshot)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "rows_seen": self.rows_seen,
+            "current_window_rows": self._window.rows,
+            "window_size": self.window_size,
+            "window_seconds": self.window_seconds,
+            "windows_closed": self.windows_closed,
+            "windows_skipped": self.windows_skipped,
+            "latest": self.reports[-1] if self.reports else None,
+            "alerts": list(self.alerts)
+        }
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+    def _record(self, window: DriftWindow):
+        try:
+            report = self.evaluate(window)
+        except Exception as e:
+            self.logger.error(f"Drift evaluation failed: {e}")
+            return
+        self.reports.append(report)
+        if report['alert']:
+            self.alerts.append({
+                'window_end': report['window_end'],
+                'rows': report['rows'],
+                'drifted_features': report['drifted_features'],
+                'mean_shift': report['mean_shift']
+            })
+            self.logger.warning(f"Input drift detected over {report['rows']} rows: "
+                                f"features {report['drifted_features']}, mean shift p={report['mean_shift']['p_value']}")
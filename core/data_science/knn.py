@@ -0,0 +1,192 @@
+import json
+import os
+import shutil
+import hashlib
+import numpy as np
+from typing import Dict
+
+class KNNIndex:
+    """
+    k-nearest-neighbour distance OOD scorer over the (standardized) training set.
+
+    The score of a row is its mean distance to the k nearest training rows; it is turned into
+    a p-value against the leave-one-out kNN distances of training rows, so multimodal data
+    is handled without assuming a single Gaussian.
+
+    Two index modes, chosen at build time:
+      - "exact": sklearn KDTree (BallTree above 15 dimensions) for up to `exact_max_rows` rows.
+      - "ivf":   inverted file index. Rows are grouped by k-means centroid and a query scans
+                 only the `n_probe` nearest lists (at most `max_candidates` rows), which bounds
+                 query latency regardless of training set size. Results are approximate.
+                 Batches are scored list by list (one distance matrix per list for all rows
+                 probing it), so large batches cost a few hundred numpy calls, not one per row.
+
+    Arrays are saved as `.npy` files in a directory (like FlatForest) and memory-mapped on load;
+    the exact tree is rebuilt from the mapped rows, which takes milliseconds at that size.
+    """
+
+    FIELDS = ("mean", "scale", "vectors", "reference_distances", "centroids", "list_offsets")
+    # Largest (query rows x list rows) distance matrix computed at once in IVF mode
+    BLOCK_SIZE = 1 << 22
+
+    def __init__(self, mean, scale, vectors, reference_distances, centroids=None, list_offsets=None,
+                 k: int = 10, n_probe: int = 8, max_candidates: int = 20000):
+        self.mean = mean                                # scaler mean / scale (numpy-only transform)
+        self.scale = scale
+        self.vectors = vectors                          # (rows, features) standardized, list-ordered for IVF
+        self.reference_distances = reference_distances  # sorted leave-one-out kNN distances
+        self.centroids = centroids                      # (lists, features), IVF only
+        self.list_offsets = list_offsets                # (lists + 1,) row ranges of each list, IVF only
+        self.k = int(k)
+        self.n_probe = int(n_probe)
+        self.max_candidates = int(max_candidates)
+        self._tree = None
+        self._version = None
+
+    @property
+    def mode(self) -> str:
+        return "exact" if self.centroids is None else "ivf"
+
+    @classmethod
+    def build(cls, X: np.ndarray, mean: np.ndarray, scale: np.ndarray,
+              k: int = 10, exact_max_rows: int = 50000, n_lists: int = None, n_probe: int = 8,
+              max_candidates: int = 20000, reference_rows: int = 2000, seed: int = 0) -> "KNNIndex":
+        mean = np.asarray(mean, dtype=float)
+        scale = np.asarray(scale, dtype=float)
+        vectors = ((np.asarray(X, dtype=float) - mean) / scale).astype(np.float32)
+        centroids = list_offsets = None
+
+        if len(vectors) > exact_max_rows:
+            from sklearn.cluster import MiniBatchKMeans
+
+            # ~4 * sqrt(N) lists, trained on a sample (the usual IVF sizing)
+            n_lists = n_lists or int(4 * np.sqrt(len(vectors)))
+            rng = np.random.default_rng(seed)
+            sample = vectors[rng.choice(len(vectors), min(len(vectors), 256 * n_lists), replace=False)]
+            kmeans = MiniBatchKMeans(n_clusters=n_lists, random_state=seed, n_init=1, batch_size=4096).fit(sample)
+            labels = np.concatenate([kmeans.predict(chunk) for chunk in np.array_split(vectors, max(1, len(vectors) // 100000))])
+
+            order = np.argsort(labels, kind="stable")
+            vectors = vectors[order]
+            centroids = kmeans.cluster_centers_.astype(np.float32)
+            list_offsets = np.concatenate([[0], np.cumsum(np.bincount(labels, minlength=n_lists))]).astype(np.int64)
+
+        index = cls(mean, scale, vectors, np.empty(0), centroids, list_offsets, k, n_probe, max_candidates)
+
+        # Leave-one-out reference: query k + 1 neighbours of training rows and drop the row itself
+        rng = np.random.default_rng(seed)
+        rows = rng.choice(len(vectors), min(len(vectors), reference_rows), replace=False)
+        distances = index._neighbour_distances(vectors[rows], k + 1)[:, 1:]
+        index.reference_distances = np.sort(distances.mean(axis=1))
+        return index
+
+    def score(self, X_input: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Mean kNN distance and its p-value (share of training rows at least as far) per row.
+        """
+        vectors = ((np.asarray(X_input, dtype=float) - self.mean) / self.scale).astype(np.float32)
+        distance = self._neighbour_distances(vectors, self.k).mean(axis=1)
+        reference = self.reference_distances
+        farther = len(reference) - np.searchsorted(reference, distance, side="left")
+        return {
+            'knn_distance': distance,
+            'knn_p_value': (farther + 1.0) / (len(reference) + 1.0)
+        }
+
+    def _neighbour_distances(self, vectors: np.ndarray, k: int) -> np.ndarray:
+        """
+        Sorted distances to the k nearest indexed rows, (rows, k).
+        """
+        k = min(k, len(self.vectors))
+        if self.centroids is None:
+            distances, _ = self._get_tree().query(vectors, k=k)
+            return distances
+
+        # Nearest lists first (the per-row |x|^2 term does not change the ranking), truncated
+        # per row to the candidate budget
+        centroid_sq = (self.centroids ** 2).sum(axis=1) - 2 * (vectors @ self.centroids.T)
+        n_probe = min(self.n_probe, len(self.centroids))
+        probes = np.argpartition(centroid_sq, n_probe - 1, axis=1)[:, :n_probe]
+        probes = np.take_along_axis(probes, np.argsort(np.take_along_axis(centroid_sq, probes, axis=1), axis=1), axis=1)
+        starts, ends = self.list_offsets[:-1], self.list_offsets[1:]
+        within_budget = np.cumsum(ends[probes] - starts[probes], axis=1) <= self.max_candidates
+        within_budget[:, 0] = True
+
+        rows, columns = np.nonzero(within_budget)
+        lists = probes[rows, columns]
+        order = np.argsort(lists, kind="stable")
+        rows, lists = rows[order], lists[order]
+        bounds = np.flatnonzero(np.diff(lists)) + 1
+        result = np.full((len(vectors), k), np.inf)
+
+        if len(vectors) <= len(bounds) + 1:
+            # Fewer rows than probed lists (single rows, micro-batches): one pass per row
+            for i in range(len(vectors)):
+                candidates = np.concatenate([self.vectors[starts[l]:ends[l]] for l in probes[i][within_budget[i]]])
+                diff = candidates - vectors[i]
+                distances = np.sqrt(np.einsum('ij,ij->i', diff, diff))
+                nearest = min(k, len(distances))
+                result[i, :nearest] = np.sort(np.partition(distances, nearest - 1)[:nearest])
+            return result
+
+        # Batched by list: every list is compared with all the rows probing it in one matrix
+        # product, and each row keeps a running top-k across its lists
+        vectors = vectors.astype(np.float64)
+        vector_sq = (vectors ** 2).sum(axis=1)
+        for group in np.split(np.arange(len(rows)), bounds):
+            l = lists[group[0]]
+            candidates = np.asarray(self.vectors[starts[l]:ends[l]], dtype=np.float64)
+            if not len(candidates):
+                continue
+            candidate_sq = (candidates ** 2).sum(axis=1)
+            # Bounded (rows x candidates) distance blocks
+            step = max(1, self.BLOCK_SIZE // len(candidates))
+            for chunk in np.array_split(rows[group], -(-len(group) // step)):
+                sq = vector_sq[chunk, None] - 2 * vectors[chunk] @ candidates.T + candidate_sq
+                merged = np.concatenate([result[chunk], np.sqrt(np.maximum(sq, 0.0))], axis=1)
+                result[chunk] = np.partition(merged, k - 1, axis=1)[:, :k]
+        return np.sort(result, axis=1)
+
+    def _get_tree(self):
+        if self._tree is None:
+            from sklearn.neighbors import BallTree, KDTree
+
+            # KD-trees degrade towards brute force in higher dimensions
+            tree_cls = KDTree if self.vectors.shape[1] <= 15 else BallTree
+            self._tree = tree_cls(np.asarray(self.vectors, dtype=float))
+        return self._tree
+
+    @property
+    def version(self) -> str:
+        if self._version is None:
+            digest = hashlib.blake2b(digest_size=8)
+            digest.update(f"{self.mode}:{self.k}:{self.n_probe}:{self.max_candidates}".encode())
+            digest.update(np.ascontiguousarray(self.reference_distances).tobytes())
+            self._version = digest.hexdigest()
+        return self._version
+
+    def save(self, path: str):
+        """
+        Writes the arrays (plus a small meta.json) into directory `path`, replacing it atomically.
+        """
+        tmp = path + ".tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        for name in self.FIELDS:
+            value = getattr(self, name)
+            if value is not None:
+                np.save(os.path.join(tmp, f"{name}.npy"), np.ascontiguousarray(value))
+        with open(os.path.join(tmp, "meta.json"), "w") as f:
+            json.dump({"k": self.k, "n_probe": self.n_probe, "max_candidates": self.max_candidates}, f)
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str, mmap_mode: str = "r") -> "KNNIndex":
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        arrays = {}
+        for name in cls.FIELDS:
+            file = os.path.join(path, f"{name}.npy")
+            arrays[name] = np.asarray(np.load(file, mmap_mode=mmap_mode)) if os.path.exists(file) else None
+        return cls(**arrays, **meta)
@@ -1,8 +1,18 @@
+import hashlib
+import os
 import numpy as np
-import pandas as pd
-from scipy.stats import chi2
-from sklearn.preprocessing import StandardScaler
-from typing import Dict, Any, List
+from typing import TYPE_CHECKING, Dict, Any, List
+
+from core.data_science.drift import reference_bins
+from core.data_science.knn import KNNIndex
+from core.data_science.streaming import RunningMoments, QuantileSketch, read_chunks
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from core.data_science.scorer import MahalanobisScorer
+
+# pandas, sklearn and scipy are imported where they are used, so rendering reports
+# (e.g. in the API process) does not pay for them at import time.
 
 class DataProfiler:
     """
@@ -13,19 +23,35 @@ class DataProfiler:
     If an input is in a 'rare region' or is OOD, the model is essentially guessing.
     Detecting this allows TRUSTSCOPE to lower the trust score before even making a prediction.
     """
+
+    # Quantile bins kept per feature for live drift monitoring (see drift_reference)
+    DRIFT_BINS = 10
+    # "mahalanobis": single-Gaussian distance; "knn": kNN distance (needs a kNN index)
+    OOD_METHODS = ("mahalanobis", "knn")
     
     def __init__(self):
+        from sklearn.preprocessing import StandardScaler
+
         self.feature_stats = {}
         self.scaler = StandardScaler()
         self.mean_train = None
         self.inv_cov_train = None
         self.feature_names = None
+        self.scorer = None
+        self.reference_bins = None
+        self.knn_index = None
+        self.ood_method = "mahalanobis"
         self.is_fitted = False
+        self._version = None
+        # Accumulators for out-of-core profiling (see partial_fit)
+        self._moments = None
+        self._sketch = None
 
-    def fit_distribution(self, df: pd.DataFrame):
+    def fit_distribution(self, df: "pd.DataFrame", knn_index: bool = False, **knn_options):
         """
         Profiles the training data distribution.
         Computes mean and inverse covariance for Mahalanobis distance.
+        With `knn_index=True` also builds a KNNIndex over the rows (see build_knn_index).
         """
         self.feature_names = df.columns.tolist()
         df_scaled = self.scaler.fit_transform(df)
@@ -43,9 +69,96 @@ class DataProfiler:
                 'q1': float(df[col].quantile(0.25)),
                 'q3': float(df[col].quantile(0.75))
             }
+        self.reference_bins = reference_bins(df[self.feature_names].to_numpy(dtype=float), self.DRIFT_BINS)
         
+        self.scorer = self._build_scorer()
         self.is_fitted = True
+        self._version = None
         print(f"[DataProfiler] Distribution profiling complete for {len(self.feature_names)} features.")
+        if knn_index:
+            self.build_knn_index(df[self.feature_names].to_numpy(dtype=float), **knn_options)
+
+    def build_knn_index(self, X: np.ndarray, **options):
+        """
+        Builds the kNN-distance OOD index over training rows X (e.g. the full training set,
+        or a sample of it after streaming profiling). `options` go to KNNIndex.build.
+        """
+        self.knn_index = KNNIndex.build(X, self.scaler.mean_, self.scaler.scale_, **options)
+        self._version = None
+        print(f"[DataProfiler] kNN index built ({self.knn_index.mode}, {len(self.knn_index.vectors)} rows).")
+
+    def use_ood_method(self, method: str):
+        if method not in self.OOD_METHODS:
+            raise ValueError(f"Unknown OOD method '{method}'. Expected one of {self.OOD_METHODS}.")
+        if method == "knn" and getattr(self, 'knn_index', None) is None:
+            raise ValueError("OOD method 'knn' needs a kNN index: fit with knn_index=True and save with DataProfiler.save.")
+        self.ood_method = method
+        self._version = None
+
+    def partial_fit(self, df_chunk: "pd.DataFrame", sketch_capacity: int = 2048):
+        """
+        Accumulates one chunk of training data for out-of-core profiling.
+        Memory stays fixed: online covariance (Welford/Chan) plus a quantile sketch for q1/q3.
+        Call `finalize_distribution()` once all chunks have been seen.
+        """
+        if self._moments is None:
+            from sklearn.preprocessing import StandardScaler
+
+            self.feature_names = df_chunk.columns.tolist()
+            self.scaler = StandardScaler()
+            self._moments = RunningMoments(len(self.feature_names))
+            self._sketch = QuantileSketch(len(self.feature_names), capacity=sketch_capacity)
+
+        values = df_chunk[self.feature_names].to_numpy(dtype=float)
+        self.scaler.partial_fit(df_chunk[self.feature_names])
+        self._moments.update(values)
+        self._sketch.update(values)
+
+    def finalize_distribution(self):
+        """
+        Builds the same profile as `fit_distribution` from the accumulated chunks.
+        Quantiles are approximate once the data outgrows the sketch; everything else is exact.
+        """
+        if self._moments is None or self._moments.count < 2:
+            raise ValueError("partial_fit must see at least two rows before finalizing.")
+
+        moments = self._moments
+        scale = self.scaler.scale_
+
+        # Scaled data has zero mean and covariance cov / (scale_i * scale_j)
+        self.mean_train = (moments.mean - self.scaler.mean_) / scale
+        self.inv_cov_train = np.linalg.pinv(moments.covariance() / np.outer(scale, scale))
+
+        stds = np.sqrt(moments.variance())
+        q1, q3 = self._sketch.quantiles([0.25, 0.75])
+        for i, col in enumerate(self.feature_names):
+            self.feature_stats[col] = {
+                'mean': float(moments.mean[i]),
+                'std': float(stds[i]),
+                'min': float(moments.min[i]),
+                'max': float(moments.max[i]),
+                'q1': float(q1[i]),
+                'q3': float(q3[i])
+            }
+        # Approximate once the sketch has compacted, like q1/q3
+        values, weights = self._sketch.items()
+        self.reference_bins = reference_bins(values, self.DRIFT_BINS, weights)
+
+        self._moments = None
+        self._sketch = None
+        self.scorer = self._build_scorer()
+        self.is_fitted = True
+        self._version = None
+        print(f"[DataProfiler] Streaming profiling complete for {len(self.feature_names)} features "
+              f"({int(self.scaler.n_samples_seen_)} rows).")
+
+    def fit_distribution_from_file(self, path: str, chunksize: int = 100_000, columns: List[str] = None):
+        """
+        Profiles a CSV or Parquet file that does not fit in memory, one chunk at a time.
+        """
+        for chunk in read_chunks(path, chunksize, columns):
+            self.partial_fit(chunk)
+        self.finalize_distribution()
 
     def compute_similarity(self, input_data: Dict[str, float]) -> Dict[str, Any]:
         """
@@ -57,34 +170,149 @@ class DataProfiler:
 
         # Convert input dict to vector
         input_vec = np.array([input_data[f] for f in self.feature_names]).reshape(1, -1)
-        input_scaled = self.scaler.transform(input_vec)
-        
-        # Mahalanobis Distance: sqrt((x-mu)' * inv_cov * (x-mu))
-        delta = input_scaled - self.mean_train
-        m_dist = np.sqrt(np.dot(np.dot(delta, self.inv_cov_train), delta.T))[0][0]
-        
-        # Calculate p-value based on Chi-Squared distribution
-        # High p-value = In-distribution, Low p-value = OOD
-        p_val = 1 - chi2.cdf(m_dist**2, df=len(self.feature_names))
-        
-        # Individual feature drift analysis (Z-score)
-        feature_drifts = {}
-        for i, col in enumerate(self.feature_names):
-            val = input_vec[0][i]
-            stats = self.feature_stats[col]
-            z_score = abs(val - stats['mean']) / (stats['std'] + 1e-9)
-            feature_drifts[col] = {
-                'z_score': round(float(z_score), 3),
-                'is_extreme': bool(z_score > 3.0)
-            }
+        batch = self.compute_similarity_batch(input_vec)
+        return self.similarity_row(batch, 0)
 
-        return {
-            'mahalanobis_distance': round(float(m_dist), 4),
-            'distribution_p_value': round(float(p_val), 4),
-            'is_ood': bool(p_val < 0.05),
+    def compute_similarity_batch(self, X_input: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Scores N rows against the training distribution in one pass.
+        Returns column arrays (one entry per row) instead of per-row dicts.
+        Uses the MahalanobisScorer compiled at fit time, plus kNN distances when an index is
+        loaded; with the "knn" OOD method those drive the p-value and the OOD flag.
+        """
+        if not self.is_fitted:
+            raise ValueError("Profiler must be fitted on training data first.")
+
+        X_input = np.asarray(X_input, dtype=float).reshape(-1, len(self.feature_names))
+        scorer = self._get_scorer()
+        batch = scorer.score(X_input)
+        knn_index = getattr(self, 'knn_index', None)
+        if knn_index is not None:
+            batch.update(knn_index.score(X_input))
+            if getattr(self, 'ood_method', "mahalanobis") == "knn":
+                batch['distribution_p_value'] = batch['knn_p_value']
+                batch['is_ood'] = batch['knn_p_value'] < scorer.alpha
+        return batch
+
+    def _build_scorer(self) -> "MahalanobisScorer":
+        from core.data_science.scorer import MahalanobisScorer
+
+        return MahalanobisScorer(
+            self.scaler,
+            self.mean_train,
+            self.inv_cov_train,
+            feature_means=[self.feature_stats[f]['mean'] for f in self.feature_names],
+            feature_stds=[self.feature_stats[f]['std'] for f in self.feature_names]
+        )
+
+    def _get_scorer(self) -> "MahalanobisScorer":
+        # Profilers pickled before the scorer existed compile it on first use
+        if getattr(self, 'scorer', None) is None:
+            self.scorer = self._build_scorer()
+        return self.scorer
+
+    SIMILARITY_DESCRIPTION = "Determines multivariate similarity to training corpus."
+
+    def similarity_row(self, batch: Dict[str, np.ndarray], i: int) -> Dict[str, Any]:
+        """
+        Renders row `i` of a `compute_similarity_batch` result as a similarity report.
+        """
+        return self.render_similarity_row(batch, i, self.feature_names)
+
+    @classmethod
+    def render_similarity_row(cls, batch: Dict[str, np.ndarray], i: int, feature_names: List[str]) -> Dict[str, Any]:
+        """
+        Same as `similarity_row`, without needing a fitted profiler (used by AssessmentBatch).
+        """
+        z_scores = batch['feature_z_scores'][i].tolist()
+        feature_drifts = {
+            col: {'z_score': round(z_score, 3), 'is_extreme': z_score > 3.0}
+            for col, z_score in zip(feature_names, z_scores)
+        }
+
+        report = {
+            'mahalanobis_distance': round(float(batch['mahalanobis_distance'][i]), 4),
+            'distribution_p_value': round(float(batch['distribution_p_value'][i]), 4),
+            'is_ood': bool(batch['is_ood'][i]),
             'feature_z_scores': feature_drifts,
-            'description': "Determines multivariate similarity to training corpus."
+            'description': cls.SIMILARITY_DESCRIPTION
         }
+        if 'knn_distance' in batch:
+            report['knn_distance'] = round(float(batch['knn_distance'][i]), 4)
+        return report
+
+    def drift_reference(self) -> Dict[str, Any]:
+        """
+        What DriftMonitor compares live traffic against: per-feature quantile bins with the
+        training share of each, and the scorer's whitening transform. Plain numpy arrays.
+        Profilers fitted before bins were stored fall back to coarser quartile bins
+        (below q1, q1-q3, above q3) from feature_stats.
+        """
+        bins = getattr(self, 'reference_bins', None)
+        if bins is None:
+            edges = np.array([[self.feature_stats[f]['q1'], self.feature_stats[f]['q3']] for f in self.feature_names])
+            bins = {"edges": edges, "proportions": np.tile([0.25, 0.5, 0.25], (len(self.feature_names), 1))}
+        scorer = self._get_scorer()
+        return {
+            "feature_names": list(self.feature_names),
+            "edges": bins["edges"],
+            "proportions": bins["proportions"],
+            "offset": scorer.offset,
+            "whitening": scorer.whitening
+        }
+
+    @property
+    def version(self) -> str:
+        """
+        Fingerprint of the fitted profile; changes whenever the profile is refitted.
+        """
+        if getattr(self, '_version', None) is None:
+            digest = hashlib.blake2b(digest_size=8)
+            digest.update(",".join(self.feature_names).encode())
+            digest.update(np.ascontiguousarray(self.mean_train, dtype=float).tobytes())
+            digest.update(np.ascontiguousarray(self.inv_cov_train, dtype=float).tobytes())
+            knn_index = getattr(self, 'knn_index', None)
+            if knn_index is not None:
+                digest.update(f"{self.ood_method}:{knn_index.version}".encode())
+            self._version = digest.hexdigest()
+        return self._version
+
+    @staticmethod
+    def knn_path(path: str) -> str:
+        """
+        Directory of the kNN index saved alongside a profiler file (profiler.joblib -> profiler.knn).
+        """
+        return os.path.splitext(path)[0] + ".knn"
+
+    def save(self, path: str):
+        """
+        Pickles the profiler to `path`; the kNN index (if any) goes to `knn_path(path)`
+        as memory-mappable arrays instead of into the pickle.
+        """
+        import joblib
+
+        knn_index, self.knn_index = getattr(self, 'knn_index', None), None
+        try:
+            joblib.dump(self, path)
+        finally:
+            self.knn_index = knn_index
+        if knn_index is not None:
+            knn_index.save(self.knn_path(path))
+
+    @classmethod
+    def load(cls, path: str, ood_method: str = None) -> "DataProfiler":
+        """
+        Loads a profiler (and its kNN index, if saved alongside) and selects the OOD method.
+        """
+        import joblib
+
+        profiler = joblib.load(path)
+        profiler.knn_index = None
+        knn_dir = cls.knn_path(path)
+        if os.path.isdir(knn_dir):
+            profiler.knn_index = KNNIndex.load(knn_dir)
+        profiler.use_ood_method(ood_method or getattr(profiler, 'ood_method', "mahalanobis"))
+        return profiler
 
     def get_summary_stats(self) -> Dict[str, Any]:
         return self.feature_stats
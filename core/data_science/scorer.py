@@ -0,0 +1,58 @@
+import numpy as np
+from scipy.special import chdtrc
+from scipy.stats import chi2
+from typing import Dict
+
+class MahalanobisScorer:
+    """
+    Precompiled OOD scorer built from a fitted DataProfiler.
+
+    The StandardScaler and the (pseudo-)inverse covariance are folded into one whitening
+    matrix W, so that Mahalanobis distance reduces to ||(x - offset) @ W||. Per-feature
+    means/stds are kept as arrays, and the chi-squared OOD threshold is computed once.
+    Scoring a batch is a handful of vectorized numpy operations.
+    """
+
+    def __init__(self, scaler, mean_train: np.ndarray, inv_cov: np.ndarray,
+                 feature_means: np.ndarray, feature_stds: np.ndarray, alpha: float = 0.05):
+        scale = np.asarray(scaler.scale_, dtype=float)
+        self.dof = len(scale)
+        self.alpha = alpha
+
+        # (x - mu_scaler) / scale - mean_train == (x - offset) / scale
+        self.offset = np.asarray(scaler.mean_, dtype=float) + scale * mean_train
+        self.whitening = self._factorize(inv_cov) / scale[:, None]
+
+        # d^2 > threshold  <=>  p-value < alpha
+        self.threshold_sq = float(chi2.isf(alpha, df=self.dof))
+
+        self.feature_means = np.asarray(feature_means, dtype=float)
+        self.inv_feature_stds = 1.0 / (np.asarray(feature_stds, dtype=float) + 1e-9)
+
+    @staticmethod
+    def _factorize(inv_cov: np.ndarray) -> np.ndarray:
+        """
+        Returns L with L @ L.T == inv_cov. Cholesky when positive definite, otherwise
+        an eigendecomposition with negative eigenvalues (numerical noise) clipped to 0.
+        """
+        try:
+            return np.linalg.cholesky(inv_cov)
+        except np.linalg.LinAlgError:
+            eigvals, eigvecs = np.linalg.eigh((inv_cov + inv_cov.T) / 2)
+            return eigvecs * np.sqrt(np.clip(eigvals, 0, None))
+
+    def score(self, X_input: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Distance, p-value, OOD flag and absolute z-scores for every row of X_input.
+        Z-scores are float32 (N x features): the largest array in a batch result.
+        """
+        centered = X_input - self.offset
+        whitened = centered @ self.whitening
+        m_sq = np.einsum('ij,ij->i', whitened, whitened)
+
+        return {
+            'mahalanobis_distance': np.sqrt(m_sq),
+            'distribution_p_value': chdtrc(self.dof, m_sq),
+            'is_ood': m_sq > self.threshold_sq,
+            'feature_z_scores': (np.abs(X_input - self.feature_means) * self.inv_feature_stds).astype(np.float32)
+        }
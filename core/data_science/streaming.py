@@ -0,0 +1,125 @@
+import numpy as np
+from typing import TYPE_CHECKING, Iterator, List, Sequence, Tuple
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+def read_chunks(path: str, chunksize: int = 100_000, columns: List[str] = None) -> Iterator["pd.DataFrame"]:
+    """
+    Reads a CSV or Parquet file as DataFrame chunks of at most `chunksize` rows.
+    """
+    if path.endswith(".parquet"):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Reading Parquet files requires pyarrow.") from e
+        batches = pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=columns)
+        return (batch.to_pandas() for batch in batches)
+
+    import pandas as pd
+    return iter(pd.read_csv(path, chunksize=chunksize, usecols=columns))
+
+class RunningMoments:
+    """
+    Online per-feature mean, min/max and full covariance over row chunks.
+    Chunks are merged with the Chan et al. parallel form of Welford's update, so memory
+    is O(features^2) regardless of how many rows are streamed.
+    """
+
+    def __init__(self, num_features: int):
+        self.count = 0
+        self.mean = np.zeros(num_features)
+        self.m2 = np.zeros((num_features, num_features))
+        self.min = np.full(num_features, np.inf)
+        self.max = np.full(num_features, -np.inf)
+
+    def update(self, chunk: np.ndarray):
+        n_b = chunk.shape[0]
+        if n_b == 0:
+            return
+        mean_b = chunk.mean(axis=0)
+        centered = chunk - mean_b
+        m2_b = centered.T @ centered
+
+        n_a = self.count
+        n = n_a + n_b
+        delta = mean_b - self.mean
+        self.mean = self.mean + delta * (n_b / n)
+        self.m2 = self.m2 + m2_b + np.outer(delta, delta) * (n_a * n_b / n)
+        self.count = n
+        self.min = np.minimum(self.min, chunk.min(axis=0))
+        self.max = np.maximum(self.max, chunk.max(axis=0))
+
+    def covariance(self, ddof: int = 1) -> np.ndarray:
+        return self.m2 / (self.count - ddof)
+
+    def variance(self, ddof: int = 1) -> np.ndarray:
+        return np.diag(self.m2) / (self.count - ddof)
+
+
+class QuantileSketch:
+    """
+    KLL-style compactor sketch tracking quantiles of every feature column at once.
+
+    Level h holds items of weight 2**h. When a level exceeds `capacity` rows, each column is
+    sorted and every other item (random offset) is promoted to the next level. All columns
+    receive the same number of items, so one 2-D array per level covers every feature.
+    Memory is O(capacity * log(n / capacity) * features); rank error is roughly
+    O(log(n / capacity) / capacity). Until the first compaction, quantiles are exact.
+    """
+
+    def __init__(self, num_features: int, capacity: int = 2048, seed: int = 0):
+        self.capacity = capacity
+        self.num_features = num_features
+        self.levels = [np.empty((0, num_features))]
+        self.rng = np.random.default_rng(seed)
+
+    def update(self, chunk: np.ndarray):
+        self.levels[0] = np.vstack([self.levels[0], chunk])
+        h = 0
+        while h < len(self.levels):
+            if self.levels[h].shape[0] > self.capacity:
+                self._compact(h)
+            h += 1
+
+    def _compact(self, h: int):
+        items = np.sort(self.levels[h], axis=0)
+        if items.shape[0] % 2:
+            # Odd count: the column-wise largest item stays behind at this level
+            items, kept = items[:-1], items[-1:]
+        else:
+            kept = items[:0]
+        promoted = items[self.rng.integers(2)::2]
+
+        self.levels[h] = kept
+        if h + 1 == len(self.levels):
+            self.levels.append(np.empty((0, self.num_features)))
+        self.levels[h + 1] = np.vstack([self.levels[h + 1], promoted])
+
+    def items(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        The retained rows and their weights, a weighted sample of everything seen.
+        """
+        values = np.vstack(self.levels)
+        weights = np.concatenate([np.full(level.shape[0], 2.0**h) for h, level in enumerate(self.levels)])
+        return values, weights
+
+    def quantiles(self, qs: Sequence[float]) -> np.ndarray:
+        """
+        Returns an array of shape (len(qs), features).
+        """
+        if len(self.levels) == 1:
+            return np.quantile(self.levels[0], qs, axis=0)
+
+        values, weights = self.items()
+
+        order = np.argsort(values, axis=0)
+        sorted_values = np.take_along_axis(values, order, axis=0)
+        cum_weights = np.cumsum(weights[order], axis=0)
+        total = cum_weights[-1]
+
+        result = np.empty((len(qs), self.num_features))
+        for i, q in enumerate(qs):
+            idx = (cum_weights < q * total).sum(axis=0)
+            result[i] = sorted_values[np.minimum(idx, len(values) - 1), np.arange(self.num_features)]
+        return result
@@ -0,0 +1,56 @@
+import torch
+import torch.nn as nn
+
+BACKENDS = ("eager", "fused", "script")
+
+class FusedSimpleNN(nn.Module):
+    """
+    Inference-only version of SimpleNN with a cheaper MC Dropout pass.
+
+    Dropout sits after the first ReLU, so the first layer is deterministic: it is computed
+    once per row and broadcast over the samples instead of being re-run on a tiled input.
+    Dropout masks are drawn with one uniform draw per layer (`rand >= p`) rather than
+    `bernoulli_`, which dominates the eager profile. Sampling follows the same distribution
+    as SimpleNN.mc_dropout_forward; the random streams differ, so samples are not identical.
+    Shares the source model's weight tensors and can be compiled with TorchScript.
+    """
+
+    def __init__(self, source: nn.Module):
+        super(FusedSimpleNN, self).__init__()
+        self.fc1 = source.fc1
+        self.fc2 = source.fc2
+        self.fc3 = source.fc3
+        self.p1 = float(source.dropout1.p)
+        self.p2 = float(source.dropout2.p)
+
+    def forward(self, x):
+        # Deterministic (eval-mode) pass, same as SimpleNN.forward with dropout disabled
+        x = torch.relu(self.fc1(x))
+        x = torch.relu(self.fc2(x))
+        return torch.sigmoid(self.fc3(x))
+
+    @torch.jit.export
+    def mc_dropout_forward(self, x, num_samples: int):
+        """
+        Returns a (num_samples, batch) tensor of probabilities, like SimpleNN.mc_dropout_forward.
+        """
+        h = torch.relu(self.fc1(x)).unsqueeze(0).expand(num_samples, -1, -1)
+        h = h * (torch.rand(h.shape) >= self.p1) * (1.0 / (1.0 - self.p1))
+        h = torch.relu(self.fc2(h))
+        h = h * (torch.rand(h.shape) >= self.p2) * (1.0 / (1.0 - self.p2))
+        return torch.sigmoid(self.fc3(h)).squeeze(-1)
+
+def build_nn_backend(nn_model: nn.Module, backend: str) -> nn.Module:
+    """
+    "eager":  the SimpleNN itself
+    "fused":  FusedSimpleNN in eager PyTorch
+    "script": FusedSimpleNN compiled with TorchScript
+    """
+    if backend == "eager":
+        return nn_model
+    fused = FusedSimpleNN(nn_model).eval()
+    if backend == "fused":
+        return fused
+    if backend == "script":
+        return torch.jit.script(fused)
+    raise ValueError(f"Unknown inference backend '{backend}'. Expected one of {BACKENDS}.")
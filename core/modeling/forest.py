@@ -0,0 +1,107 @@
+import json
+import os
+import shutil
+import numpy as np
+
+class FlatForest:
+    """
+    A fitted RandomForestClassifier flattened into a few contiguous node arrays.
+
+    All trees share one set of arrays (child indices are global), saved as plain `.npy`
+    files in a directory. Loading with `mmap_mode='r'` maps those files instead of
+    unpickling the forest, so every worker process on a node shares one page-cache
+    copy and loading takes milliseconds. sklearn's own Tree objects copy their nodes
+    on unpickling, which is why the forest is stored in this layout.
+
+    `predict_proba` walks every tree for every row at once (one gather per depth level)
+    and matches sklearn: inputs are compared as float32, leaf class fractions averaged.
+    """
+
+    FIELDS = ("feature", "threshold", "children", "value", "roots")
+
+    def __init__(self, feature, threshold, children, value, roots, classes, max_depth):
+        self.feature = feature      # (nodes,) split feature, -1 at leaves
+        self.threshold = threshold  # (nodes,) split threshold
+        self.children = children    # (nodes, 2) global [right, left] child indices
+        self.value = value          # (nodes, classes) class fractions at leaves
+        self.roots = roots          # (trees,) root node of each tree
+        self.classes_ = np.asarray(classes)
+        self.max_depth = int(max_depth)
+
+    @classmethod
+    def from_sklearn(cls, forest) -> "FlatForest":
+        features, thresholds, children, values, roots = [], [], [], [], []
+        offset = 0
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            is_leaf = tree.children_left < 0
+            roots.append(offset)
+            features.append(np.where(is_leaf, -1, tree.feature))
+            thresholds.append(tree.threshold)
+            children.append(np.where(is_leaf[:, None], -1,
+                                     np.stack([tree.children_right, tree.children_left], axis=1) + offset))
+            # Per-leaf class fractions (what DecisionTreeClassifier.predict_proba returns)
+            value = tree.value[:, 0, :]
+            values.append(value / np.maximum(value.sum(axis=1, keepdims=True), 1e-300))
+            offset += tree.node_count
+
+        # Index arrays are stored as int64 so lookups never need a per-call cast
+        return cls(
+            np.concatenate(features).astype(np.int64),
+            np.concatenate(thresholds).astype(np.float64),
+            np.concatenate(children).astype(np.int64),
+            np.concatenate(values).astype(np.float64),
+            np.asarray(roots, dtype=np.int64),
+            forest.classes_,
+            max(estimator.tree_.max_depth for estimator in forest.estimators_)
+        )
+
+    def save(self, path: str):
+        """
+        Writes the arrays (plus a small meta.json) into directory `path`, replacing it atomically.
+        """
+        tmp = path + ".tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        for name in self.FIELDS:
+            np.save(os.path.join(tmp, f"{name}.npy"), np.ascontiguousarray(getattr(self, name)))
+        with open(os.path.join(tmp, "meta.json"), "w") as f:
+            json.dump({"classes": self.classes_.tolist(), "max_depth": self.max_depth}, f)
+        # Processes that mapped the old files keep reading them until they reload
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str, mmap_mode: str = "r") -> "FlatForest":
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        # Plain ndarray views over the mapping (np.memmap adds overhead to every indexing op)
+        arrays = [np.asarray(np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode)) for name in cls.FIELDS]
+        return cls(*arrays, classes=meta["classes"], max_depth=meta["max_depth"])
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in self.FIELDS)
+
+    def predict_proba(self, X_input: np.ndarray) -> np.ndarray:
+        # sklearn validates tree inputs as float32 before comparing against float64 thresholds
+        X = np.asarray(X_input, dtype=np.float32)
+        num_rows, num_features = X.shape
+        num_trees = len(self.roots)
+        values = X.ravel()
+
+        # One cursor per (row, tree) pair; only cursors still at internal nodes are advanced
+        node = np.tile(self.roots, num_rows)
+        row_offset = np.repeat(np.arange(num_rows, dtype=np.int64) * num_features, num_trees)
+        active = np.flatnonzero(self.feature.take(node) >= 0)
+        children = self.children.ravel()
+        for _ in range(self.max_depth):
+            if not active.size:
+                break
+            current = node.take(active)
+            go_left = values.take(row_offset.take(active) + self.feature.take(current)) <= self.threshold.take(current)
+            current = children.take(current * 2 + go_left)
+            node[active] = current
+            active = active[self.feature.take(current) >= 0]
+
+        return self.value.take(node, axis=0).reshape(num_rows, num_trees, -1).mean(axis=1)
@@ -0,0 +1,48 @@
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+import numpy as np
+
+@contextmanager
+def timed(timings: Dict[str, float], name: str):
+    """
+    Adds the enclosed block's duration (ms) to `timings[name]`.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = (time.perf_counter() - start) * 1000.0
+        timings[name] = round(timings.get(name, 0.0) + elapsed, 3)
+
+class InferenceContext:
+    """
+    Carries a single request (one or many rows) through the trust pipeline.
+
+    The ensemble probabilities are computed once, on first access, and then shared
+    by the uncertainty estimator, trust engine and audit logger. Each stage can be
+    wrapped in `stage()` to build a per-request latency breakdown in milliseconds.
+    Pass `predictions` to reuse probabilities computed earlier (e.g. from a cache).
+    """
+
+    def __init__(self, model_manager, X_input: np.ndarray, predictions: Dict[str, np.ndarray] = None):
+        self.model_manager = model_manager
+        self.X_input = X_input
+        self.timings: Dict[str, float] = {}
+        self.ensemble_passes = 0
+        self._predictions = predictions
+
+    @property
+    def predictions(self) -> Dict[str, np.ndarray]:
+        if self._predictions is None:
+            with self.stage("predictions"):
+                self._predictions = self.model_manager.predict_all(self.X_input, self.timings)
+            self.ensemble_passes += 1
+        return self._predictions
+
+    def stage(self, name: str):
+        """
+        Times the enclosed block. Repeated stages accumulate; nested stages are inclusive.
+        """
+        return timed(self.timings, name)
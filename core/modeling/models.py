@@ -1,12 +1,18 @@
 import torch
 import torch.nn as nn
+import torch.nn.functional as F
 import torch.optim as optim
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.linear_model import LogisticRegression
 import numpy as np
 import joblib
+import hashlib
 import os
 
+from core.modeling.backends import build_nn_backend
+from core.modeling.forest import FlatForest
+from core.modeling.inference import timed
+
 class SimpleNN(nn.Module):
     """
     A simple MLP with Dropout for Monte Carlo Dropout uncertainty estimation.
@@ -28,6 +34,22 @@ class SimpleNN(nn.Module):
         x = self.sigmoid(self.fc3(x))
         return x
 
+    def mc_dropout_forward(self, x, num_samples):
+        """
+        Runs `num_samples` stochastic passes as one batched forward pass.
+        The input is tiled to (num_samples * batch, features) so every row gets its own
+        dropout masks. Dropout is applied functionally, so the module's train/eval
+        mode is left untouched. Returns a (num_samples, batch) tensor of probabilities.
+        """
+        batch_size = x.shape[0]
+        x = x.repeat(num_samples, 1)
+        x = torch.relu(self.fc1(x))
+        x = F.dropout(x, p=self.dropout1.p, training=True)
+        x = torch.relu(self.fc2(x))
+        x = F.dropout(x, p=self.dropout2.p, training=True)
+        x = self.sigmoid(self.fc3(x))
+        return x.view(num_samples, batch_size)
+
 class TrustModelManager:
     """
     Manages an ensemble of models for prediction and subsequent trust analysis.
@@ -40,13 +62,20 @@ class TrustModelManager:
         self.rf_model = RandomForestClassifier(n_estimators=100, random_state=42)
         self.lr_model = LogisticRegression(max_iter=1000)
         self.nn_model = SimpleNN(input_dim)
+        # Module used for inference (predictions and MC Dropout); see use_backend
+        self.backend = "eager"
+        self.nn_inference = self.nn_model
         
         self.is_trained = False
+        # Fingerprint of the artifacts currently loaded (changes on every save/load of new models)
+        self.version = None
 
     def train(self, X_train, y_train):
         print("[TrustModelManager] Training ensemble models...")
         
-        # Train Random Forest
+        # Train Random Forest (a loaded FlatForest is inference-only)
+        if isinstance(self.rf_model, FlatForest):
+            self.rf_model = RandomForestClassifier(n_estimators=100, random_state=42)
         self.rf_model.fit(X_train, y_train)
         
         # Train Logistic Regression
@@ -68,39 +97,163 @@ class TrustModelManager:
             optimizer.step()
         
         self.is_trained = True
+        self.use_backend(self.backend)
         self.save_models()
         print("[TrustModelManager] Ensemble training complete.")
 
+    ARTIFACTS = ("rf_model.joblib", "lr_model.joblib", "nn_model.pth")
+    FOREST_DIR = "rf_forest"
+
+    @classmethod
+    def artifact_version(cls, model_dir="data/models"):
+        """
+        Cheap fingerprint of the saved artifacts (name, size, mtime); no model is loaded.
+        Covers `rf_forest/` too, since that (not the pickle) is the forest being served.
+        """
+        names = list(cls.ARTIFACTS)
+        if os.path.exists(os.path.join(model_dir, cls.FOREST_DIR, "meta.json")):
+            names += [os.path.join(cls.FOREST_DIR, f) for f in ("meta.json", *(f"{n}.npy" for n in FlatForest.FIELDS))]
+        digest = hashlib.blake2b(digest_size=8)
+        for name in names:
+            stat = os.stat(os.path.join(model_dir, name))
+            digest.update(f"{name}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+        return digest.hexdigest()
+
     def save_models(self):
-        joblib.dump(self.rf_model, os.path.join(self.model_dir, "rf_model.joblib"))
+        # A loaded FlatForest is the already-saved forest (inference-only): keep the pickle and arrays
+        if not isinstance(self.rf_model, FlatForest):
+            joblib.dump(self.rf_model, os.path.join(self.model_dir, "rf_model.joblib"))
+            # Memory-mappable copy of the forest that serving processes load instead of the pickle
+            FlatForest.from_sklearn(self.rf_model).save(os.path.join(self.model_dir, self.FOREST_DIR))
         joblib.dump(self.lr_model, os.path.join(self.model_dir, "lr_model.joblib"))
         torch.save(self.nn_model.state_dict(), os.path.join(self.model_dir, "nn_model.pth"))
+        self.version = self.artifact_version(self.model_dir)
+
+    def load_models(self, executor=None):
+        """
+        Loads the saved artifacts. With an `executor`, the RF, LR and NN files load concurrently.
+        The RF is served from the memory-mapped `rf_forest/` arrays when present (see FlatForest),
+        so it is shared across worker processes; otherwise the sklearn pickle is loaded.
+        """
+        self._use_artifacts(*self._load_artifacts(self.model_dir, executor))
+
+    @classmethod
+    def from_dir(cls, model_dir="data/models", executor=None):
+        """
+        Loads a manager from saved artifacts; the NN input size is read from its weights,
+        so this does not have to wait for the profiler.
+        """
+        rf_model, lr_model, nn_state = cls._load_artifacts(model_dir, executor)
+        manager = cls(input_dim=nn_state["fc1.weight"].shape[1], model_dir=model_dir)
+        manager._use_artifacts(rf_model, lr_model, nn_state)
+        return manager
 
-    def load_models(self):
-        self.rf_model = joblib.load(os.path.join(self.model_dir, "rf_model.joblib"))
-        self.lr_model = joblib.load(os.path.join(self.model_dir, "lr_model.joblib"))
-        self.nn_model.load_state_dict(torch.load(os.path.join(self.model_dir, "nn_model.pth")))
+    def _use_artifacts(self, rf_model, lr_model, nn_state):
+        self.rf_model = rf_model
+        self.lr_model = lr_model
+        self.nn_model.load_state_dict(nn_state)
         self.is_trained = True
+        self.version = self.artifact_version(self.model_dir)
+        self.use_backend(self.backend)
 
-    def predict_all(self, X_input):
+    def use_backend(self, backend: str = "eager"):
+        """
+        Selects the NN inference backend ("eager", "fused" or "script", see
+        core.modeling.backends). `nn_model` stays the reference SimpleNN used for
+        training, saving and parity checks.
+        """
+        self.nn_inference = build_nn_backend(self.nn_model, backend)
+        self.backend = backend
+
+    def parity_report(self, X_input, mc_samples: int = 2000) -> dict:
+        """
+        Compares the serving path with the reference models on X_input:
+          - rf_max_abs_diff: FlatForest vs the sklearn pickle (only when serving a FlatForest)
+          - nn_max_abs_diff: backend vs SimpleNN deterministic forward
+          - mc_mean_max_z:   largest z-score between backend and SimpleNN MC Dropout means
+                             (the backends draw different masks, so this is a statistical check)
+        """
+        X_input = np.asarray(X_input, dtype=float)
+        X_tensor = torch.as_tensor(X_input, dtype=torch.float32)
+        report = {}
+        if isinstance(self.rf_model, FlatForest):
+            reference = joblib.load(os.path.join(self.model_dir, "rf_model.joblib"))
+            report["rf_max_abs_diff"] = float(np.abs(
+                self.rf_model.predict_proba(X_input)[:, 1] - reference.predict_proba(X_input)[:, 1]
+            ).max())
+
+        self.nn_model.eval()
+        # Seeded on a forked RNG so the check is reproducible without touching the serving RNG state
+        with torch.no_grad(), torch.random.fork_rng(devices=[]):
+            torch.manual_seed(0)
+            report["nn_max_abs_diff"] = float((self.nn_inference(X_tensor) - self.nn_model(X_tensor)).abs().max())
+            var_a, mean_a = torch.var_mean(self.nn_inference.mc_dropout_forward(X_tensor, mc_samples), dim=0)
+            var_b, mean_b = torch.var_mean(self.nn_model.mc_dropout_forward(X_tensor, mc_samples), dim=0)
+            z = (mean_a - mean_b).abs() / torch.sqrt((var_a + var_b) / mc_samples + 1e-12)
+            report["mc_mean_max_z"] = float(z.max())
+        return report
+
+    def check_parity(self, X_input, atol: float = 1e-5, max_z: float = 5.0) -> dict:
+        """
+        Raises ValueError if the serving path diverges from the reference models.
+        """
+        report = self.parity_report(X_input)
+        failures = [k for k, v in report.items() if v > (max_z if k == "mc_mean_max_z" else atol)]
+        if failures:
+            raise ValueError(f"Inference backend '{self.backend}' failed parity check: {report}")
+        return report
+
+    @classmethod
+    def export_forest(cls, model_dir="data/models"):
+        """
+        Writes `rf_forest/` for artifacts saved before the flattened layout existed.
+        """
+        forest = joblib.load(os.path.join(model_dir, "rf_model.joblib"))
+        FlatForest.from_sklearn(forest).save(os.path.join(model_dir, cls.FOREST_DIR))
+
+    @classmethod
+    def _load_forest(cls, model_dir):
+        forest_dir = os.path.join(model_dir, cls.FOREST_DIR)
+        if os.path.exists(os.path.join(forest_dir, "meta.json")):
+            return FlatForest.load(forest_dir, mmap_mode="r")
+        return joblib.load(os.path.join(model_dir, "rf_model.joblib"), mmap_mode="r")
+
+    @classmethod
+    def _load_artifacts(cls, model_dir, executor=None):
+        loads = (
+            (cls._load_forest, model_dir),
+            (joblib.load, os.path.join(model_dir, "lr_model.joblib")),
+            (torch.load, os.path.join(model_dir, "nn_model.pth"))
+        )
+        if executor is None:
+            return tuple(load(path) for load, path in loads)
+        futures = [executor.submit(load, path) for load, path in loads]
+        return tuple(future.result() for future in futures)
+
+    def predict_all(self, X_input, timings=None):
         """
         Returns predictions and probabilities from all models in the ensemble.
+        With a `timings` dict, each model's duration (ms) is added under predict_rf/lr/nn.
         """
         if not self.is_trained:
             self.load_models()
+        timings = {} if timings is None else timings
 
         X_tensor = torch.FloatTensor(X_input)
         
         # RF Predictions
-        rf_prob = self.rf_model.predict_proba(X_input)[:, 1]
+        with timed(timings, "predict_rf"):
+            rf_prob = self.rf_model.predict_proba(X_input)[:, 1]
         
         # LR Predictions
-        lr_prob = self.lr_model.predict_proba(X_input)[:, 1]
+        with timed(timings, "predict_lr"):
+            lr_prob = self.lr_model.predict_proba(X_input)[:, 1]
         
         # NN Predictions (Evaluation mode)
-        self.nn_model.eval()
-        with torch.no_grad():
-            nn_prob = self.nn_model(X_tensor).numpy().flatten()
+        with timed(timings, "predict_nn"):
+            self.nn_inference.eval()
+            with torch.no_grad():
+                nn_prob = self.nn_inference(X_tensor).numpy().flatten()
             
         return {
             'rf': rf_prob,
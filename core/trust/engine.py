@@ -1,11 +1,18 @@
 import numpy as np
-from typing import Dict, Any
+from typing import Dict, Any, List
 
 class TrustScoreEngine:
     """
     The 'Brain' of TRUSTSCOPE. 
     Synthesizes multiple reliability signals into a single trust decision.
     """
+
+    LABELS = np.array(["UNSAFE", "REVIEW", "SAFE"])
+    RECOMMENDATIONS = {
+        "SAFE": "Automated decision recommended.",
+        "REVIEW": "Human-in-the-loop review recommended due to moderate uncertainty.",
+        "UNSAFE": "Prediction rejected. Extreme uncertainty or OOD detected. Manual intervention REQUIRED."
+    }
     
     def __init__(self, weights: Dict[str, float] = None):
         # Default weights for different trust components
@@ -18,51 +25,111 @@ class TrustScoreEngine:
 
     def compute_trust_score(self, 
                            predictions: Dict[str, float],
-                           uncertainty_report: Dict[str, Any]) -> Dict[str, Any]:
+                           uncertainty_report: Dict[str, Any],
+                           calibration_factor: float = None) -> Dict[str, Any]:
         """
         Calculates a 0-100 Trust Score.
+        `calibration_factor` (0-1, see OnlineCalibrator) adds the calibration component when known.
+        """
+        scores = self._score(
+            np.array([uncertainty_report['ensemble_disagreement']['disagreement_variance']]),
+            np.array([uncertainty_report['total_uncertainty_score']]),
+            np.array([uncertainty_report['data_similarity']['distribution_p_value']]),
+            calibration_factor
+        )
+        return self.report_row(scores, 0)
+
+    def compute_trust_scores_batch(self, uncertainty_batch: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Calculates Trust Scores for every row of an `estimate_total_uncertainty_batch` result.
+        The scoring itself is vectorized; only the final report dicts are built per row.
+        """
+        scores = self.score_batch(uncertainty_batch)
+        return [self.report_row(scores, i) for i in range(len(scores['trust_score']))]
+
+    def score_batch(self, uncertainty_batch: Dict[str, Any], calibration_factor: float = None) -> Dict[str, np.ndarray]:
+        """
+        Trust scores, labels and component scores as column arrays (no per-row dicts).
+        """
+        return self._score(
+            uncertainty_batch['ensemble_disagreement']['disagreement_variance'],
+            uncertainty_batch['total_uncertainty_score'],
+            uncertainty_batch['data_similarity']['distribution_p_value'],
+            calibration_factor
+        )
+
+    def apply_calibration(self, scores: Dict[str, np.ndarray], calibration_factor: float = None) -> Dict[str, np.ndarray]:
         """
+        Re-scores a `score_batch` result with a (new) calibration factor. Only the weighted
+        sum and the labels are recomputed, so this is cheap enough for the request path.
+        """
+        return self._combine(scores['agreement'], scores['uncertainty'], scores['distribution_similarity'],
+                             calibration_factor)
+
+    def _score(self, disagreement: np.ndarray, total_uncertainty: np.ndarray, p_value: np.ndarray,
+               calibration_factor: float = None) -> Dict[str, np.ndarray]:
         # 1. Agreement Signal (0 to 1, higher is better)
-        disagreement = uncertainty_report['ensemble_disagreement']['disagreement_variance']
-        agreement_score = max(0, 1.0 - (disagreement * 4.0)) # Scale: 0.25 variance = 0 agreement
+        agreement_score = np.maximum(0, 1.0 - (disagreement * 4.0)) # Scale: 0.25 variance = 0 agreement
         
         # 2. Uncertainty Signal (0 to 1, higher is better)
-        uncertainty_score = 1.0 - uncertainty_report['total_uncertainty_score']
+        uncertainty_score = 1.0 - total_uncertainty
         
         # 3. OOD Signal (0 to 1, higher is better)
-        ood_score = uncertainty_report['data_similarity']['distribution_p_value']
+        ood_score = p_value
         
         # 4. Consistency Signal (Mean of predictions vs individual)
         # (This is partially covered by ensemble disagreement)
-        
+
+        return self._combine(agreement_score, uncertainty_score, ood_score, calibration_factor)
+
+    def _combine(self, agreement_score: np.ndarray, uncertainty_score: np.ndarray, ood_score: np.ndarray,
+                 calibration_factor: float = None) -> Dict[str, np.ndarray]:
         # Weighted Synthesis
         final_score = (
             agreement_score * self.weights['agreement'] + 
             uncertainty_score * self.weights['uncertainty'] + 
             ood_score * self.weights['ood']
         )
+        # 5. Calibration Signal (0 to 1), only once live calibration has enough labels
+        if calibration_factor is not None:
+            final_score = final_score + calibration_factor * self.weights['calibration']
         
         # Normalize to 0-100
-        trust_percentage = round(float(final_score * 100), 2)
+        trust_percentage = np.round(final_score * 100, 2)
         
-        # Category Logic
-        if trust_percentage > 80 and ood_score > 0.05:
-            label = "SAFE"
-            recommendation = "Automated decision recommended."
-        elif trust_percentage > 50:
-            label = "REVIEW"
-            recommendation = "Human-in-the-loop review recommended due to moderate uncertainty."
-        else:
-            label = "UNSAFE"
-            recommendation = "Prediction rejected. Extreme uncertainty or OOD detected. Manual intervention REQUIRED."
+        # Category Logic: 2 = SAFE, 1 = REVIEW, 0 = UNSAFE
+        label_idx = np.where(
+            (trust_percentage > 80) & (ood_score > 0.05), 2,
+            np.where(trust_percentage > 50, 1, 0)
+        )
 
-        return {
+        scores = {
             'trust_score': trust_percentage,
+            'trust_label': self.LABELS[label_idx],
+            'agreement': agreement_score,
+            'uncertainty': uncertainty_score,
+            'distribution_similarity': ood_score
+        }
+        if calibration_factor is not None:
+            scores['calibration'] = calibration_factor
+        return scores
+
+    @classmethod
+    def report_row(cls, scores: Dict[str, np.ndarray], i: int) -> Dict[str, Any]:
+        """
+        Renders row `i` of a `score_batch` result as a trust report.
+        """
+        label = str(scores['trust_label'][i])
+        report = {
+            'trust_score': float(scores['trust_score'][i]),
             'trust_label': label,
-            'recommendation': recommendation,
+            'recommendation': cls.RECOMMENDATIONS[label],
             'component_scores': {
-                'agreement': round(agreement_score, 4),
-                'uncertainty': round(uncertainty_score, 4),
-                'distribution_similarity': round(ood_score, 4)
+                'agreement': round(float(scores['agreement'][i]), 4),
+                'uncertainty': round(float(scores['uncertainty'][i]), 4),
+                'distribution_similarity': round(float(scores['distribution_similarity'][i]), 4)
             }
         }
+        if 'calibration' in scores:
+            report['component_scores']['calibration'] = round(float(scores['calibration']), 4)
+        return report
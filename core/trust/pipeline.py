@@ -0,0 +1,122 @@
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List
+
+from core.data_science.profiler import DataProfiler
+from core.modeling.models import TrustModelManager
+from core.modeling.inference import InferenceContext, timed
+from core.uncertainty.estimator import UncertaintyEstimator
+from core.trust.engine import TrustScoreEngine
+from core.explain.explainer import TrustExplainer
+from core.trust.results import AssessmentBatch
+
+class TrustPipeline:
+    """
+    End-to-end trust assessment for a feature matrix:
+    ensemble predictions -> uncertainty -> trust score -> explanation.
+
+    Holds only read-only fitted components, so one instance can serve many concurrent
+    requests, and each inference worker process builds exactly one at startup.
+    """
+
+    def __init__(self, model_manager: TrustModelManager, profiler,
+                 trust_engine: TrustScoreEngine = None, explainer: TrustExplainer = None):
+        self.model_manager = model_manager
+        self.profiler = profiler
+        self.estimator = UncertaintyEstimator(model_manager, profiler)
+        self.trust_engine = trust_engine or TrustScoreEngine()
+        self.explainer = explainer or TrustExplainer()
+
+    @classmethod
+    def from_artifacts(cls, profiler_path: str = "data/profiler.joblib", model_dir: str = "data/models",
+                       backend: str = "eager", ood_method: str = None):
+        """
+        Loads a pipeline from saved artifacts. A non-"eager" NN `backend` is checked
+        against the reference models before it is used (see TrustModelManager.check_parity).
+        `ood_method` overrides the profiler's OOD method ("mahalanobis" or "knn").
+        """
+        # The profiler and the three model files are independent: load them concurrently
+        with ThreadPoolExecutor(max_workers=4, thread_name_prefix="trustscope-load") as executor:
+            profiler = executor.submit(DataProfiler.load, profiler_path, ood_method)
+            model_manager = TrustModelManager.from_dir(model_dir, executor)
+            profiler = profiler.result()
+
+        if backend != "eager":
+            model_manager.use_backend(backend)
+            report = model_manager.check_parity(cls._parity_rows(profiler))
+            print(f"[TrustPipeline] '{backend}' backend passed parity check: {report}")
+        return cls(model_manager, profiler)
+
+    @staticmethod
+    def _parity_rows(profiler, num_rows: int = 64) -> np.ndarray:
+        # Synthetic rows around the training distribution (fixed seed, reproducible)
+        stats = [profiler.feature_stats[f] for f in profiler.feature_names]
+        rng = np.random.default_rng(0)
+        return rng.normal([s['mean'] for s in stats], [s['std'] for s in stats], size=(num_rows, len(stats)))
+
+    @property
+    def feature_names(self) -> List[str]:
+        return self.profiler.feature_names
+
+    def to_matrix(self, records: List[Dict[str, float]]) -> np.ndarray:
+        """
+        Orders feature dicts into an (N, features) matrix using the profiler's feature order.
+        """
+        return np.array([[record[f] for f in self.feature_names] for record in records])
+
+    def assess_batch(self,
+                     X_input: np.ndarray,
+                     num_samples: int = 50,
+                     mc_tolerance: float = None,
+                     tone: str = "technical",
+                     deterministic: Dict[str, Any] = None) -> AssessmentBatch:
+        """
+        Scores every row of X_input in one batched pass and returns the signals as column
+        arrays; no per-row dicts are built. `batch.deterministic` holds the ensemble
+        probabilities and OOD similarity: passing those back in as `deterministic` skips
+        recomputing them, so only MC Dropout runs again.
+        """
+        deterministic = deterministic or {}
+        context = InferenceContext(self.model_manager, X_input, deterministic.get("predictions"))
+
+        # 1. Get raw predictions (computed once, shared by every later stage)
+        raw_preds = context.predictions
+
+        # 2. Estimate uncertainty
+        with context.stage("uncertainty"):
+            uncertainty_batch = self.estimator.estimate_total_uncertainty_batch(
+                X_input, context, num_samples=num_samples, mc_tolerance=mc_tolerance,
+                similarity=deterministic.get("similarity")
+            )
+
+        # 3. Compute trust scores
+        with context.stage("trust_score"):
+            scores = self.trust_engine.score_batch(uncertainty_batch)
+
+        return AssessmentBatch(
+            self.feature_names, raw_preds, uncertainty_batch, scores, self.explainer,
+            tone=tone, timings_ms=context.timings, batch_size=len(X_input)
+        )
+
+    def assess(self,
+               X_input: np.ndarray,
+               num_samples: int = 50,
+               mc_tolerance: float = None,
+               tone: str = "technical",
+               deterministic: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        `assess_batch` rendered as dicts: the raw ensemble probabilities (column arrays),
+        one report per row, the per-stage timing breakdown and the deterministic signals.
+        """
+        batch = self.assess_batch(X_input, num_samples, mc_tolerance, tone, deterministic)
+
+        # 4. Generate explanations
+        with timed(batch.timings_ms, "explanation"):
+            results = batch.rows()
+
+        return {
+            "predictions": batch.predictions,
+            "results": results,
+            "timings_ms": batch.timings_ms,
+            "deterministic": batch.deterministic
+        }
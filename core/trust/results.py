@@ -0,0 +1,108 @@
+import numpy as np
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional
+
+from core.explain.explainer import TrustExplainer
+from core.trust.engine import TrustScoreEngine
+from core.uncertainty.estimator import UncertaintyEstimator
+
+@dataclass(slots=True)
+class AssessmentBatch:
+    """
+    Columnar result of `TrustPipeline.assess_batch`: one array per signal instead of one
+    nested dict per row. Rows are rendered into report dicts only on demand (`row`, `rows`),
+    i.e. at the API edge; batch jobs can read the arrays directly.
+    Pickles as a handful of arrays, which keeps worker -> API transfers small.
+    """
+    feature_names: List[str]
+    predictions: Dict[str, np.ndarray]
+    uncertainty: Dict[str, Any]
+    scores: Dict[str, np.ndarray]
+    explainer: TrustExplainer
+    tone: str = "technical"
+    timings_ms: Dict[str, float] = field(default_factory=dict)
+    batch_size: int = 0
+    worker_pid: Optional[int] = None
+    # Profile of the pipeline call, when the request was sampled for profiling
+    profile: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self.scores['trust_score'])
+
+    @property
+    def deterministic(self) -> Dict[str, Any]:
+        """
+        The signals that do not depend on MC Dropout sampling (see TrustPipeline.assess_batch).
+        """
+        return {"predictions": self.predictions, "similarity": self.uncertainty['data_similarity']}
+
+    def take(self, rows) -> "AssessmentBatch":
+        """
+        A new batch holding only `rows` (a slice or index array) of every column.
+        """
+        return AssessmentBatch(
+            self.feature_names,
+            _take(self.predictions, rows),
+            _take(self.uncertainty, rows),
+            _take(self.scores, rows),
+            self.explainer,
+            self.tone,
+            dict(self.timings_ms),
+            self.batch_size,
+            self.worker_pid,
+            self.profile
+        )
+
+    def trust_report(self, i: int) -> Dict[str, Any]:
+        return TrustScoreEngine.report_row(self.scores, i)
+
+    def row(self, i: int) -> Dict[str, Any]:
+        """
+        Report dict for row `i`: prediction, trust, explanation and signals.
+        """
+        trust_report = self.trust_report(i)
+        return {
+            "prediction": {k: float(v[i]) for k, v in self.predictions.items()},
+            "trust": trust_report,
+            "explanation": self.explainer.synthesize_explanation(trust_report, tone=self.tone),
+            "signals": UncertaintyEstimator.render_uncertainty_row(self.uncertainty, i, self.feature_names)
+        }
+
+    def rows(self) -> List[Dict[str, Any]]:
+        return [self.row(i) for i in range(len(self))]
+
+    def to_columns(self) -> Dict[str, np.ndarray]:
+        """
+        Flat one-value-per-row columns (predictions, trust, component scores and signals),
+        e.g. for a DataFrame or Parquet table. Per-feature z-scores are reduced to their max.
+        """
+        n = len(self)
+        ensemble = self.uncertainty['ensemble_disagreement']
+        mc_dropout = self.uncertainty['mc_dropout']
+        similarity = self.uncertainty['data_similarity']
+
+        columns = {f"prediction_{name}": values for name, values in self.predictions.items()}
+        for name in ('trust_score', 'trust_label', 'agreement', 'uncertainty', 'distribution_similarity', 'calibration'):
+            if name in self.scores:
+                columns[name] = np.broadcast_to(self.scores[name], n)
+        columns.update({
+            'disagreement_mean': ensemble['disagreement_mean'],
+            'disagreement_variance': ensemble['disagreement_variance'],
+            'mc_mean': mc_dropout['mc_mean'],
+            'mc_variance': mc_dropout['mc_variance'],
+            'total_uncertainty_score': self.uncertainty['total_uncertainty_score'],
+            'mahalanobis_distance': similarity['mahalanobis_distance'],
+            'distribution_p_value': similarity['distribution_p_value'],
+            'is_ood': similarity['is_ood'],
+            'max_feature_z_score': similarity['feature_z_scores'].max(axis=1)
+        })
+        if 'knn_distance' in similarity:
+            columns['knn_distance'] = similarity['knn_distance']
+        return columns
+
+def _take(columns, rows):
+    if isinstance(columns, dict):
+        return {k: _take(v, rows) for k, v in columns.items()}
+    if isinstance(columns, np.ndarray) and columns.ndim:
+        return columns[rows]
+    return columns
@@ -1,6 +1,8 @@
 import numpy as np
-import torch
-from typing import Dict, Any
+from typing import Dict, Any, List
+
+from core.data_science.profiler import DataProfiler
+from core.modeling.inference import InferenceContext
 
 class UncertaintyEstimator:
     """
@@ -11,25 +13,33 @@ class UncertaintyEstimator:
     3. Distance-based (OOD): Based on feature-space similarity.
     """
     
-    def __init__(self, model_manager, profiler):
+    def __init__(self, model_manager, profiler, mc_max_rows: int = 262144):
         self.model_manager = model_manager
         self.profiler = profiler
+        # Upper bound on tiled rows (num_samples * batch) per MC Dropout forward pass
+        self.mc_max_rows = mc_max_rows
 
-    def get_ensemble_disagreement(self, X_input: np.ndarray) -> Dict[str, Any]:
+    def get_ensemble_disagreement(self, X_input: np.ndarray, context: InferenceContext = None) -> Dict[str, Any]:
         """
         Calculates the variance and range of predictions across the ensemble.
         High disagreement = High Epistemic uncertainty.
         """
-        probs = self.model_manager.predict_all(X_input)
+        batch = self.get_ensemble_disagreement_batch(X_input, context)
+        return self._ensemble_row(batch, 0)
+
+    def get_ensemble_disagreement_batch(self, X_input: np.ndarray, context: InferenceContext = None) -> Dict[str, Any]:
+        """
+        Ensemble disagreement for N rows. Every value is an array of length N.
+        Reuses the context's ensemble probabilities when they were already computed.
+        """
+        context = context or InferenceContext(self.model_manager, X_input)
+        probs = context.predictions
         stacked_probs = np.stack([probs['rf'], probs['lr'], probs['nn']])
-        
-        variance = np.var(stacked_probs, axis=0)
-        mean_prob = np.mean(stacked_probs, axis=0)
-        
+
         return {
-            'disagreement_variance': round(float(variance[0]), 4),
-            'disagreement_mean': round(float(mean_prob[0]), 4),
-            'raw_probs': {k: round(float(v[0]), 4) for k, v in probs.items()}
+            'disagreement_variance': np.var(stacked_probs, axis=0),
+            'disagreement_mean': np.mean(stacked_probs, axis=0),
+            'raw_probs': probs
         }
 
     def get_mc_dropout_uncertainty(self, X_input: np.ndarray, num_samples: int = 50) -> Dict[str, Any]:
@@ -37,44 +47,175 @@ class UncertaintyEstimator:
         Performs multiple forward passes with dropout enabled to estimate model uncertainty.
         Mathematical intuition: Sampling from the approximate posterior of weights.
         """
-        X_tensor = torch.FloatTensor(X_input)
-        self.model_manager.nn_model.train() # Enable dropout
-        
-        samples = []
+        batch = self.get_mc_dropout_uncertainty_batch(X_input, num_samples)
+        return self._mc_dropout_row(batch, 0)
+
+    def get_mc_dropout_uncertainty_batch(self, X_input: np.ndarray, num_samples: int = 50) -> Dict[str, Any]:
+        """
+        MC Dropout for N rows. All `num_samples` passes run as a single tiled forward pass,
+        so the cost is one (num_samples x N) matrix product chain instead of a Python loop.
+        Very large batches are split into row chunks bounded by `mc_max_rows`.
+        """
+        import torch  # Deferred: rendering-only processes (the API in process mode) never load torch
+        X_tensor = torch.as_tensor(np.asarray(X_input), dtype=torch.float32)
+        nn_model = self.model_manager.nn_inference
+        rows_per_pass = max(1, self.mc_max_rows // num_samples)
+
+        means, variances = [], []
         with torch.no_grad():
-            for _ in range(num_samples):
-                samples.append(self.model_manager.nn_model(X_tensor).numpy())
-                
-        samples = np.array(samples)
-        variance = np.var(samples, axis=0)
-        mean_prob = np.mean(samples, axis=0)
-        
+            for chunk in torch.split(X_tensor, rows_per_pass):
+                samples = nn_model.mc_dropout_forward(chunk, num_samples)
+                variance, mean_prob = torch.var_mean(samples, dim=0, correction=0)
+                means.append(mean_prob)
+                variances.append(variance)
+
+        return {
+            'mc_variance': torch.cat(variances).numpy(),
+            'mc_mean': torch.cat(means).numpy(),
+            'num_samples': num_samples
+        }
+
+    def get_mc_dropout_uncertainty_adaptive_batch(self,
+                                                  X_input: np.ndarray,
+                                                  max_samples: int = 50,
+                                                  tolerance: float = 0.01,
+                                                  chunk_size: int = 10) -> Dict[str, Any]:
+        """
+        Sequential MC Dropout: draws passes in chunks of `chunk_size` and stops sampling a row
+        once the standard error of its MC mean, sqrt(var / n), is within `tolerance`,
+        or once `max_samples` passes are spent. Only unconverged rows are re-sampled, so
+        easy in-distribution rows stop early while hard rows get the full budget.
+        Running moments are merged per chunk (Chan et al. parallel variance update).
+        """
+        import torch
+        X_tensor = torch.as_tensor(np.asarray(X_input), dtype=torch.float32)
+        nn_model = self.model_manager.nn_inference
+        num_rows = X_tensor.shape[0]
+        chunk_size = max(2, min(chunk_size, max_samples))
+
+        count = np.zeros(num_rows)
+        mean = np.zeros(num_rows)
+        m2 = np.zeros(num_rows)
+        active = np.arange(num_rows)
+
+        with torch.no_grad():
+            while active.size:
+                draws = int(min(chunk_size, max_samples - count[active[0]]))
+                samples = nn_model.mc_dropout_forward(X_tensor[active], draws).double()
+                chunk_var, chunk_mean = torch.var_mean(samples, dim=0, correction=0)
+                chunk_mean, chunk_m2 = chunk_mean.numpy(), chunk_var.numpy() * draws
+
+                n_a = count[active]
+                n = n_a + draws
+                delta = chunk_mean - mean[active]
+                mean[active] += delta * draws / n
+                m2[active] += chunk_m2 + delta**2 * n_a * draws / n
+                count[active] = n
+
+                # Converged: standard error of the MC mean within tolerance
+                std_err = np.sqrt(m2[active] / n / n)
+                keep = (std_err > tolerance) & (n < max_samples)
+                active = active[keep]
+
         return {
-            'mc_variance': round(float(variance[0]), 4),
-            'mc_mean': round(float(mean_prob[0]), 4),
-            'description': f"Stochastic variance over {num_samples} passes."
+            'mc_variance': m2 / count,
+            'mc_mean': mean,
+            'num_samples': max_samples,
+            'samples_used': count.astype(int)
         }
 
-    def estimate_total_uncertainty(self, X_input: np.ndarray, input_dict: Dict[str, float]) -> Dict[str, Any]:
+    def estimate_total_uncertainty(self,
+                                   X_input: np.ndarray,
+                                   input_dict: Dict[str, float],
+                                   context: InferenceContext = None,
+                                   num_samples: int = 50,
+                                   mc_tolerance: float = None) -> Dict[str, Any]:
         """
         Aggregates all uncertainty signals.
         """
-        ensemble = self.get_ensemble_disagreement(X_input)
-        mc_dropout = self.get_mc_dropout_uncertainty(X_input)
-        dist_analysis = self.profiler.compute_similarity(input_dict)
-        
+        batch = self.estimate_total_uncertainty_batch(X_input, context, num_samples, mc_tolerance)
+        return self.uncertainty_row(batch, 0)
+
+    def estimate_total_uncertainty_batch(self,
+                                         X_input: np.ndarray,
+                                         context: InferenceContext = None,
+                                         num_samples: int = 50,
+                                         mc_tolerance: float = None,
+                                         similarity: Dict[str, np.ndarray] = None) -> Dict[str, Any]:
+        """
+        Aggregates all uncertainty signals for N rows using matrix operations only.
+        The profiler scores the same feature matrix, so no per-row dicts are built.
+        Pass the request's InferenceContext to reuse its ensemble pass and record stage timings.
+        `num_samples` trades MC Dropout accuracy for latency. With `mc_tolerance` set,
+        MC Dropout stops early per row and `num_samples` becomes the sample budget.
+        A precomputed `similarity` batch skips the (deterministic) OOD scoring.
+        """
+        context = context or InferenceContext(self.model_manager, X_input)
+        ensemble = self.get_ensemble_disagreement_batch(X_input, context)
+        with context.stage("mc_dropout"):
+            if mc_tolerance is None:
+                mc_dropout = self.get_mc_dropout_uncertainty_batch(X_input, num_samples)
+            else:
+                mc_dropout = self.get_mc_dropout_uncertainty_adaptive_batch(X_input, num_samples, mc_tolerance)
+        if similarity is None:
+            with context.stage("similarity"):
+                similarity = self.profiler.compute_similarity_batch(X_input)
+        dist_analysis = similarity
+
         # Normalized uncertainty score (0 to 1)
         # Combination of disagreement, MC variance, and OOD-ness
         combined_score = (
-            ensemble['disagreement_variance'] * 2.0 + 
-            mc_dropout['mc_variance'] * 1.5 + 
+            ensemble['disagreement_variance'] * 2.0 +
+            mc_dropout['mc_variance'] * 1.5 +
             (1.0 - dist_analysis['distribution_p_value']) * 0.5
         )
-        normalized_score = min(max(combined_score, 0), 1)
-        
+
         return {
             'ensemble_disagreement': ensemble,
             'mc_dropout': mc_dropout,
             'data_similarity': dist_analysis,
-            'total_uncertainty_score': round(float(normalized_score), 4)
+            'total_uncertainty_score': np.clip(combined_score, 0, 1)
+        }
+
+    def uncertainty_row(self, batch: Dict[str, Any], i: int) -> Dict[str, Any]:
+        """
+        Renders row `i` of an `estimate_total_uncertainty_batch` result as an uncertainty report.
+        """
+        return self.render_uncertainty_row(batch, i, self.profiler.feature_names)
+
+    @classmethod
+    def render_uncertainty_row(cls, batch: Dict[str, Any], i: int, feature_names: List[str]) -> Dict[str, Any]:
+        """
+        Same as `uncertainty_row`, without needing loaded models (used by AssessmentBatch).
+        """
+        return {
+            'ensemble_disagreement': cls._ensemble_row(batch['ensemble_disagreement'], i),
+            'mc_dropout': cls._mc_dropout_row(batch['mc_dropout'], i),
+            'data_similarity': DataProfiler.render_similarity_row(batch['data_similarity'], i, feature_names),
+            'total_uncertainty_score': round(float(batch['total_uncertainty_score'][i]), 4)
+        }
+
+    @staticmethod
+    def _ensemble_row(batch: Dict[str, Any], i: int) -> Dict[str, Any]:
+        return {
+            'disagreement_variance': round(float(batch['disagreement_variance'][i]), 4),
+            'disagreement_mean': round(float(batch['disagreement_mean'][i]), 4),
+            'raw_probs': {k: round(float(v[i]), 4) for k, v in batch['raw_probs'].items()}
+        }
+
+    @staticmethod
+    def _mc_dropout_row(batch: Dict[str, Any], i: int) -> Dict[str, Any]:
+        if 'samples_used' not in batch:
+            return {
+                'mc_variance': round(float(batch['mc_variance'][i]), 4),
+                'mc_mean': round(float(batch['mc_mean'][i]), 4),
+                'description': f"Stochastic variance over {batch['num_samples']} passes."
+            }
+
+        samples_used = int(batch['samples_used'][i])
+        return {
+            'mc_variance': round(float(batch['mc_variance'][i]), 4),
+            'mc_mean': round(float(batch['mc_mean'][i]), 4),
+            'samples_used': samples_used,
+            'description': f"Stochastic variance over {samples_used} of {batch['num_samples']} passes (adaptive)."
         }
@@ -0,0 +1,152 @@
+import asyncio
+import time
+from collections import Counter
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from core.trust.results import AssessmentBatch
+
+class MicroBatcher:
+    """
+    Merges concurrent single-row assessments into batched pipeline passes.
+
+    Requests wait in a queue until either `max_batch_size` rows are collected or
+    `max_wait_ms` has passed since the first one arrived. The collected rows run as one
+    batched ensemble / MC Dropout / OOD pass on the InferencePool and each waiting future
+    receives its own slice of the result. Rows are only merged with rows that share
+    the same MC Dropout options. At most `max_in_flight` batches run at once
+    (defaults to the pool's worker count), so the queue absorbs bursts instead of the pool.
+    """
+
+    def __init__(self, pool, max_batch_size: int = 64, max_wait_ms: float = 2.0, max_in_flight: int = None):
+        self.pool = pool
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_in_flight = max_in_flight or pool.workers
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._collector: Optional[asyncio.Task] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._in_flight = set()
+
+        # Metrics
+        self.batches_total = 0
+        self.rows_total = 0
+        self.max_batch_seen = 0
+        self.batch_sizes = Counter()
+
+    async def submit(self, x_row: np.ndarray, num_samples: int = 50, mc_tolerance: float = None) -> AssessmentBatch:
+        """
+        Queues one feature row and waits for its share of a batched assessment.
+        Returns this row's one-row AssessmentBatch slice of the merged pass.
+        """
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((np.asarray(x_row).reshape(-1), (num_samples, mc_tolerance), future, time.perf_counter()))
+        return await future
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "batches_total": self.batches_total,
+            "rows_total": self.rows_total,
+            "mean_batch_size": round(self.rows_total / self.batches_total, 3) if self.batches_total else 0.0,
+            "max_batch_size_seen": self.max_batch_seen,
+            "batch_size_counts": dict(sorted(self.batch_sizes.items())),
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0
+        }
+
+    async def close(self):
+        if self._collector:
+            self._collector.cancel()
+            try:
+                await self._collector
+            except asyncio.CancelledError:
+                pass
+            self._collector = None
+        self._fail_pending(RuntimeError("Micro-batcher closed."))
+
+    def _ensure_started(self):
+        if self._collector is None or self._collector.done():
+            if self._collector is not None:
+                # The collector died: requests still queued for it would otherwise wait forever
+                error = None if self._collector.cancelled() else self._collector.exception()
+                self._fail_pending(error or RuntimeError("Micro-batcher collector stopped."))
+            self._queue = asyncio.Queue()
+            self._slots = asyncio.Semaphore(self.max_in_flight)
+            self._collector = asyncio.get_running_loop().create_task(self._collect())
+
+    def _fail_pending(self, error: BaseException, items: list = ()):
+        """
+        Fails `items` plus every request still in the queue with `error`.
+        """
+        items = list(items)
+        while self._queue is not None and not self._queue.empty():
+            items.append(self._queue.get_nowait())
+        for item in items:
+            if not item[2].done():
+                item[2].set_exception(error)
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            items = [await self._queue.get()]
+            # Rows taken off the queue but not yet handed to a batch task
+            undispatched: Dict[Tuple, list] = {None: items}
+            try:
+                deadline = loop.time() + self.max_wait
+                while len(items) < self.max_batch_size:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        items.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+
+                # Only rows with identical MC Dropout options can share a pass
+                groups: Dict[Tuple, list] = {}
+                for item in items:
+                    groups.setdefault(item[1], []).append(item)
+                undispatched = dict(groups)
+                for options, group in groups.items():
+                    await self._slots.acquire()
+                    task = loop.create_task(self._run(options, group))
+                    del undispatched[options]
+                    # Keep a reference so the running batch is not garbage-collected
+                    self._in_flight.add(task)
+                    task.add_done_callback(self._in_flight.discard)
+            except BaseException as e:
+                # Fail them (and everything still queued) rather than leave them waiting forever
+                error = e if isinstance(e, Exception) else RuntimeError("Micro-batcher closed.")
+                self._fail_pending(error, [item for group in undispatched.values() for item in group])
+                raise
+
+    async def _run(self, options: Tuple, group: list):
+        try:
+            X_input = np.stack([item[0] for item in group])
+            dispatched = time.perf_counter()
+            self.batches_total += 1
+            self.rows_total += len(group)
+            self.max_batch_seen = max(self.max_batch_seen, len(group))
+            self.batch_sizes[len(group)] += 1
+
+            try:
+                assessment = await self.pool.assess(X_input, *options)
+            except Exception as e:
+                for item in group:
+                    if not item[2].done():
+                        item[2].set_exception(e)
+                return
+
+            for i, (_, _, future, enqueued) in enumerate(group):
+                if future.done():
+                    continue
+                row = assessment.take(slice(i, i + 1))
+                row.timings_ms["batch_wait"] = round((dispatched - enqueued) * 1000.0, 3)
+                row.batch_size = len(group)
+                future.set_result(row)
+        finally:
+            self._slots.release()
@@ -0,0 +1,105 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+class AssessmentCache:
+    """
+    Bounded LRU + TTL cache of assessment results keyed by the ordered feature vector.
+
+    Keys are a blake2b digest of the float64 feature row, the model and profiler versions
+    and (for full results) the MC Dropout options, so a reloaded model or refitted profile
+    never serves stale entries. When `set_versions` sees a version change, the whole cache
+    is dropped.
+
+    Two kinds of entries share the same budget:
+      - "deterministic": ensemble probabilities and OOD similarity for a row (RF/LR/NN
+                         forward passes and Mahalanobis scoring do not depend on sampling).
+      - "full":          the complete rendered assessment, including MC Dropout; only
+                         stored when the API runs with CACHE_MODE="full".
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self.versions: Tuple[str, str] = ("", "")
+
+        self._entries: "OrderedDict[bytes, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def key(self, x_row: np.ndarray, kind: str, options: Tuple = ()) -> bytes:
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(np.ascontiguousarray(x_row, dtype=np.float64).tobytes())
+        digest.update(f"|{kind}|{self.versions[0]}|{self.versions[1]}|{options!r}".encode())
+        return digest.digest()
+
+    def set_versions(self, model_version: str, profiler_version: str) -> bool:
+        """
+        Records the versions of the loaded artifacts. Returns True (and clears the cache)
+        if they differ from the ones the current entries were computed with.
+        """
+        versions = (str(model_version), str(profiler_version))
+        with self._lock:
+            if versions == self.versions:
+                return False
+            changed = self.versions != ("", "")
+            self.versions = versions
+            self._entries.clear()
+            if changed:
+                self.invalidations += 1
+            return changed
+
+    def get(self, key: bytes) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[0] < now:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: bytes, value: Any):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "model_version": self.versions[0],
+            "profiler_version": self.versions[1]
+        }
@@ -1,20 +1,50 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Request
+from fastapi.exception_handlers import request_validation_exception_handler
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-import joblib
+from fastapi.responses import PlainTextResponse, Response
+from pydantic import BaseModel, Field
+import asyncio
+import secrets
+import time
+import uuid
 import numpy as np
-import pandas as pd
-from typing import Dict, List, Any
+from dataclasses import replace
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple
 
-# Internal imports
-from core.data_science.profiler import DataProfiler
-from core.modeling.models import TrustModelManager
-from core.uncertainty.estimator import UncertaintyEstimator
+# Internal imports. torch/sklearn/scipy are only pulled in by the pipeline modules, which
+# are imported at startup (and only in thread/inline mode: process workers load their own).
+from core.modeling.inference import timed
+from core.calibration.online import OnlineCalibrator
+from core.data_science.drift import DriftMonitor
 from core.trust.engine import TrustScoreEngine
-from core.explain.explainer import TrustExplainer
+from core.trust.results import AssessmentBatch
 from infrastructure.mlops.logger import TrustLogger
+from infrastructure.mlops.writer import AuditQueueFull
+from infrastructure.api.batching import MicroBatcher
+from infrastructure.api.cache import AssessmentCache
+from infrastructure.api.metrics import AssessmentMetrics
+from infrastructure.api.profiling import RequestProfiler
+from infrastructure.api.workers import InferencePool
+from infrastructure.config import settings
+from infrastructure import encoding
 
-app = FastAPI(title="TRUSTSCOPE API", description="AI Prediction Reliability & Trust Assessment Platform")
+class TrustJSONResponse(Response):
+    """
+    JSON response rendered with the shared encoder (numpy-aware, orjson when installed).
+    Routes return it directly, which skips FastAPI's jsonable_encoder walk.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return encoding.dumps(content)
+
+app = FastAPI(
+    title="TRUSTSCOPE API",
+    description="AI Prediction Reliability & Trust Assessment Platform",
+    default_response_class=TrustJSONResponse
+)
 
 # Enable CORS
 app.add_middleware(
@@ -29,92 +59,496 @@ state = {
     "profiler": None,
     "model_manager": None,
     "uncertainty_estimator": None,
-    "trust_engine": TrustScoreEngine(),
-    "explainer": TrustExplainer(),
-    "logger": TrustLogger()
+    # Same weights the workers score with (calibration is applied at the API edge)
+    "trust_engine": None,
+    "pool": None,
+    "batcher": None,
+    "cache": None,
+    "artifact_versions": None,
+    "feature_names": None,
+    "logger": None,
+    "calibration": None,
+    "drift": None,
+    "metrics": AssessmentMetrics() if settings.METRICS_ENABLED else None,
+    # Always present so profiling can be switched on at runtime (POST /admin/profiling)
+    "profiling": RequestProfiler(
+        settings.PROFILING_DIR,
+        enabled=settings.PROFILING_ENABLED,
+        sample_rate=settings.PROFILING_SAMPLE_RATE,
+        slow_ms=settings.PROFILING_SLOW_MS,
+        mode=settings.PROFILING_MODE,
+        max_files=settings.PROFILING_MAX_FILES,
+        interval_ms=settings.PROFILING_INTERVAL_MS
+    ),
+    # Readiness: set once artifacts are loaded and every worker has run a warm-up inference
+    "ready": False,
+    "startup": None,
+    "startup_error": None,
+    "startup_ms": None
 }
 
 class PredictionRequest(BaseModel):
     features: Dict[str, float]
+    # Fewer MC Dropout passes = lower latency, noisier uncertainty estimate
+    mc_samples: int = Field(50, ge=1, le=1000)
+    # If set, MC Dropout stops early once the MC mean's standard error is below this
+    mc_tolerance: Optional[float] = Field(None, gt=0)
 
-@app.on_event("startup")
-def startup_event():
+class BatchPredictionRequest(BaseModel):
+    records: List[Dict[str, float]]
+    mc_samples: int = Field(50, ge=1, le=1000)
+    mc_tolerance: Optional[float] = Field(None, gt=0)
+
+class FeedbackRequest(BaseModel):
+    assessment_id: str
+    # Observed ground truth for the assessed prediction
+    label: int = Field(..., ge=0, le=1)
+
+class ProfilingRequest(BaseModel):
+    enabled: Optional[bool] = None
+    sample_rate: Optional[float] = Field(None, ge=0, le=1)
+    slow_ms: Optional[float] = Field(None, ge=0)
+    mode: Optional[str] = None
+
+def load_components():
+    """
+    Loads artifacts, starts and warms up the inference workers. Runs off the event loop,
+    so the server answers /health (503 "starting") while this is in progress.
+    """
+    started = time.perf_counter()
     try:
-        # Load pre-trained artifacts
-        state["profiler"] = joblib.load("data/profiler.joblib")
-        
-        # Initialize model manager
-        sample_features = state["profiler"].feature_names
-        state["model_manager"] = TrustModelManager(input_dim=len(sample_features))
-        state["model_manager"].load_models()
-        
-        # Initialize uncertainty estimator
-        state["uncertainty_estimator"] = UncertaintyEstimator(
-            state["model_manager"], 
-            state["profiler"]
+        pipeline = None
+        if settings.INFERENCE_MODE != "process":
+            # Thread/inline modes share one in-process pipeline
+            from core.trust.pipeline import TrustPipeline
+            pipeline = TrustPipeline.from_artifacts(settings.PROFILER_PATH, settings.MODEL_DIR,
+                                                    settings.INFERENCE_BACKEND, settings.OOD_METHOD or None)
+            state["profiler"] = pipeline.profiler
+            state["model_manager"] = pipeline.model_manager
+            state["uncertainty_estimator"] = pipeline.estimator
+
+        # Inference runs off the event loop; process workers each load the artifacts once
+        state["pool"] = InferencePool(
+            pipeline,
+            mode=settings.INFERENCE_MODE,
+            workers=settings.INFERENCE_WORKERS or None,
+            torch_threads=settings.TORCH_THREADS,
+            profiler_path=settings.PROFILER_PATH,
+            model_dir=settings.MODEL_DIR,
+            backend=settings.INFERENCE_BACKEND,
+            ood_method=settings.OOD_METHOD or None
         )
-        print("[API] All components loaded successfully.")
+        worker_info = state["pool"].warm_up()
+        state["feature_names"] = worker_info["feature_names"]
+        state["trust_engine"] = pipeline.trust_engine if pipeline else TrustScoreEngine(worker_info["trust_weights"])
+
+        if settings.BATCHING_ENABLED:
+            # Concurrent single-row requests share batched pipeline passes
+            state["batcher"] = MicroBatcher(
+                state["pool"],
+                max_batch_size=settings.BATCH_MAX_SIZE,
+                max_wait_ms=settings.BATCH_MAX_WAIT_MS
+            )
+
+        if settings.CACHE_ENABLED:
+            state["cache"] = AssessmentCache(settings.CACHE_MAX_ENTRIES, settings.CACHE_TTL_SECONDS)
+            # Process workers report the versions of the artifacts they loaded
+            state["artifact_versions"] = (worker_info["model_version"], worker_info["profiler_version"])
+
+        if settings.DRIFT_ENABLED:
+            state["drift"] = DriftMonitor(
+                worker_info["drift_reference"],
+                window_size=settings.DRIFT_WINDOW_SIZE,
+                window_seconds=settings.DRIFT_WINDOW_SECONDS,
+                psi_threshold=settings.DRIFT_PSI_THRESHOLD,
+                p_value=settings.DRIFT_P_VALUE,
+                min_rows=settings.DRIFT_MIN_ROWS,
+                history=settings.DRIFT_HISTORY
+            )
+
+        state["startup_ms"] = round((time.perf_counter() - started) * 1000.0, 1)
+        state["ready"] = True
+        print(f"[API] All components loaded successfully ({settings.INFERENCE_MODE} mode, "
+              f"{state['pool'].workers} workers, {worker_info['backend']} backend, "
+              f"{worker_info['ood_method']} OOD, {state['startup_ms']} ms).")
     except Exception as e:
+        state["startup_error"] = str(e)
         print(f"[API] Startup error: {e}")
 
-def deep_clean(obj):
-    """Recursively convert numpy types to Python primitives."""
-    if isinstance(obj, dict):
-        return {k: deep_clean(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [deep_clean(x) for x in obj]
-    elif isinstance(obj, np.integer):
-        return int(obj)
-    elif isinstance(obj, np.floating):
-        return float(obj)
-    elif isinstance(obj, np.ndarray):
-        return obj.tolist()
-    elif isinstance(obj, np.bool_):
-        return bool(obj)
+@app.on_event("startup")
+async def startup_event():
+    state["logger"] = TrustLogger(
+        settings.LOG_DIR,
+        async_writes=settings.AUDIT_ASYNC,
+        rotate_bytes=settings.AUDIT_ROTATE_BYTES or None,
+        rotate_daily=settings.AUDIT_ROTATE_DAILY,
+        archive_format=settings.AUDIT_ARCHIVE_FORMAT,
+        max_queue=settings.AUDIT_QUEUE_SIZE,
+        batch_size=settings.AUDIT_BATCH_SIZE,
+        fsync=settings.AUDIT_FSYNC,
+        fsync_interval=settings.AUDIT_FSYNC_INTERVAL,
+        put_timeout=settings.AUDIT_PUT_TIMEOUT
+    )
+    if settings.CALIBRATION_ENABLED:
+        state["calibration"] = OnlineCalibrator(
+            num_bins=settings.CALIBRATION_BINS,
+            min_labels=settings.CALIBRATION_MIN_LABELS,
+            max_pending=settings.CALIBRATION_MAX_PENDING,
+            state_path=settings.CALIBRATION_STATE_PATH
+        )
+    state["startup"] = asyncio.get_running_loop().run_in_executor(None, load_components)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    if state["startup"]:
+        await state["startup"]
+    if state["batcher"]:
+        await state["batcher"].close()
+    if state["pool"]:
+        state["pool"].shutdown()
+    if state["drift"]:
+        state["drift"].close()
+    # Keep accumulated calibration across restarts
+    if state["calibration"]:
+        state["calibration"].save()
+    # Drain buffered audit entries before the process exits
+    if state["logger"]:
+        state["logger"].close()
+
+@app.exception_handler(RequestValidationError)
+async def validation_error(request: Request, exc: RequestValidationError):
+    # Counted like handler errors, then FastAPI's usual 422 response
+    record_error(request.url.path, "ValidationError")
+    return await request_validation_exception_handler(request, exc)
+
+def require_ready(endpoint: str):
+    if state["startup_error"]:
+        record_error(endpoint, "StartupFailed")
+        raise HTTPException(status_code=503, detail="System not initialized. Run setup script.")
+    if not state["ready"]:
+        record_error(endpoint, "NotReady")
+        raise HTTPException(status_code=503, detail="System warming up. Retry once /health reports healthy.")
+
+def record_error(endpoint: str, error_type: str):
+    if state["metrics"]:
+        state["metrics"].observe_error(endpoint, error_type)
+
+def artifact_versions():
+    """
+    Versions of the artifacts serving requests; read live when the pipeline is in-process,
+    so reloading models or refitting the profiler invalidates the cache.
+    """
+    model_manager = state["model_manager"]
+    if model_manager is not None:
+        return model_manager.version, state["uncertainty_estimator"].profiler.version
+    return state["artifact_versions"]
+
+async def run_assessment(x_input: np.ndarray, mc_samples: int, mc_tolerance: Optional[float],
+                         profile: Optional[str] = None) -> Tuple[AssessmentBatch, Optional[str]]:
+    """
+    One-row assessment through the cache (if enabled), then the micro-batcher or the pool.
+    Returns the columnar result and the cache outcome ("full", "deterministic", "miss" or None).
+    Profiled requests go straight to the pool, so the profile covers this request's full pipeline run.
+    """
+    if profile:
+        return await assess_profiled(x_input, mc_samples, mc_tolerance, profile), None
+
+    cache = state["cache"]
+    if cache is None:
+        if state["batcher"]:
+            return await state["batcher"].submit(x_input[0], mc_samples, mc_tolerance), None
+        return await state["pool"].assess(x_input, mc_samples, mc_tolerance), None
+
+    cache.set_versions(*artifact_versions())
+    full_mode = settings.CACHE_MODE == "full"
+    full_key = cache.key(x_input[0], "full", (mc_samples, mc_tolerance))
+    if full_mode:
+        cached = cache.get(full_key)
+        if cached is not None:
+            record_cache("full")
+            return replace(cached, timings_ms={}), "full"
+
+    det_key = cache.key(x_input[0], "deterministic")
+    deterministic = cache.get(det_key)
+    if deterministic is not None:
+        # Ensemble and OOD signals are reused; only MC Dropout runs
+        assessment = await state["pool"].assess(x_input, mc_samples, mc_tolerance, deterministic=deterministic)
+        outcome = "deterministic"
     else:
-        return obj
+        if state["batcher"]:
+            assessment = await state["batcher"].submit(x_input[0], mc_samples, mc_tolerance)
+        else:
+            assessment = await state["pool"].assess(x_input, mc_samples, mc_tolerance)
+        cache.put(det_key, assessment.deterministic)
+        outcome = "miss"
+
+    if full_mode:
+        cache.put(full_key, assessment)
+    record_cache(outcome)
+    return assessment, outcome
+
+def record_cache(outcome: str):
+    if state["metrics"]:
+        state["metrics"].observe_cache(outcome)
+
+async def assess_profiled(x_input: np.ndarray, mc_samples: int, mc_tolerance: Optional[float],
+                          profile: Optional[str]) -> AssessmentBatch:
+    return await state["pool"].assess(x_input, mc_samples, mc_tolerance, profile=profile,
+                                      profile_interval_ms=state["profiling"].interval_ms)
+
+def capture_request(endpoint: str, started: float, assessment: AssessmentBatch, **details):
+    """
+    Hands a profiled or slow request to the profiler; the file is written off the event loop.
+    """
+    profiler = state["profiling"]
+    total_ms = (time.perf_counter() - started) * 1000.0
+    if not profiler.should_capture(assessment.profile is not None, total_ms):
+        return
+    asyncio.get_running_loop().run_in_executor(
+        None, write_capture, endpoint, total_ms, dict(assessment.timings_ms), assessment.profile,
+        {"batch_size": assessment.batch_size, "worker_pid": assessment.worker_pid, **details}
+    )
+
+def write_capture(endpoint: str, total_ms: float, timings_ms: Dict[str, float], profile: Optional[str],
+                  details: Dict[str, Any]):
+    try:
+        state["profiling"].capture(endpoint, total_ms, timings_ms, profile, **details)
+    except OSError as e:
+        print(f"[API] Failed to write profiling capture: {e}")
+
+def track_calibration(assessment: AssessmentBatch) -> List[str]:
+    """
+    Assigns an id to each row, registers its ensemble probability for later feedback and
+    applies the live calibration factor (if active) to the trust scores.
+    """
+    assessment_ids = [uuid.uuid4().hex for _ in range(len(assessment))]
+    calibration = state["calibration"]
+    if calibration is None:
+        return assessment_ids
+
+    probabilities = assessment.uncertainty['ensemble_disagreement']['disagreement_mean']
+    for assessment_id, probability in zip(assessment_ids, probabilities):
+        calibration.record(assessment_id, probability)
+    factor = calibration.trust_factor
+    if factor is not None:
+        assessment.scores = state["trust_engine"].apply_calibration(assessment.scores, factor)
+    return assessment_ids
 
 @app.post("/assess")
 async def assess_prediction(request: PredictionRequest):
-    if not state["profiler"]:
-        raise HTTPException(status_code=503, detail="System not initialized. Run setup script.")
+    started = time.perf_counter()
+    require_ready("/assess")
 
     try:
         features = request.features
         # Convert to numpy for model processing
-        feature_names = state["profiler"].feature_names
+        feature_names = state["feature_names"]
         x_input = np.array([[features[f] for f in feature_names]])
         
-        # 1. Get raw predictions
-        raw_preds = state["model_manager"].predict_all(x_input)
-        
-        # 2. Estimate uncertainty
-        uncertainty_report = state["uncertainty_estimator"].estimate_total_uncertainty(x_input, features)
-        
-        # 3. Compute trust score
-        trust_report = state["trust_engine"].compute_trust_score(raw_preds, uncertainty_report)
-        
-        # 4. Generate explanations
-        explanation = state["explainer"].synthesize_explanation(trust_report, tone="technical")
+        # Sampled for profiling? (disabled: one attribute read)
+        profiling = state["profiling"]
+        profile = profiling.sample() if profiling.enabled else None
+
+        # 1-3. Predictions, uncertainty and trust score (off the event loop, columnar)
+        assessment, cache_outcome = await run_assessment(x_input, request.mc_samples, request.mc_tolerance, profile)
+        if state["drift"]:
+            state["drift"].update(x_input)
+        raw_preds = assessment.predictions
+        timings = assessment.timings_ms
+        assessment_id = track_calibration(assessment)[0]
+
+        # 4. Render the report and explanation (API edge only)
+        with timed(timings, "explanation"):
+            result = assessment.row(0)
         
         # 5. Log decision
-        state["logger"].log_decision(features, raw_preds, trust_report)
+        with timed(timings, "logging"):
+            await state["logger"].log_decisions_async([features], [raw_preds], [result["trust"]], timings, [assessment_id])
         
         response = {
-            "prediction": raw_preds,
-            "trust": trust_report,
-            "explanation": explanation,
-            "signals": uncertainty_report
+            "assessment_id": assessment_id,
+            "prediction": raw_preds,  # numpy columns are encoded natively
+            "trust": result["trust"],
+            "explanation": result["explanation"],
+            "signals": result["signals"],
+            "timings_ms": timings
         }
+        if cache_outcome:
+            response["cache"] = cache_outcome
+        if state["metrics"]:
+            state["metrics"].observe_assessment("/assess", timings, assessment.scores['trust_label'],
+                                                time.perf_counter() - started)
+        if profiling.enabled:
+            capture_request("/assess", started, assessment, mc_samples=request.mc_samples,
+                            cache=cache_outcome, assessment_ids=[assessment_id])
         
-        return deep_clean(response)
+        return TrustJSONResponse(response)
+    except AuditQueueFull as e:
+        record_error("/assess", type(e).__name__)
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
+        record_error("/assess", type(e).__name__)
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/assess/batch")
+async def assess_batch(request: BatchPredictionRequest):
+    started = time.perf_counter()
+    require_ready("/assess/batch")
+    if not request.records:
+        return {"results": []}
+
+    try:
+        records = request.records
+        # One (N, features) matrix for the whole batch
+        feature_names = state["feature_names"]
+        x_input = np.array([[record[f] for f in feature_names] for record in records])
+
+        profiling = state["profiling"]
+        profile = profiling.sample() if profiling.enabled else None
+
+        # 1-3. Predictions, uncertainty and trust scores (off the event loop, columnar)
+        if profile:
+            assessment = await assess_profiled(x_input, request.mc_samples, request.mc_tolerance, profile)
+        else:
+            assessment = await state["pool"].assess(x_input, request.mc_samples, request.mc_tolerance)
+        if state["drift"]:
+            state["drift"].update(x_input)
+        timings = assessment.timings_ms
+        assessment_ids = track_calibration(assessment)
+
+        # 4. Render reports and explanations (API edge only)
+        with timed(timings, "explanation"):
+            results = assessment.rows()
+        for assessment_id, result in zip(assessment_ids, results):
+            result["assessment_id"] = assessment_id
+
+        # 5. Log decisions
+        with timed(timings, "logging"):
+            await state["logger"].log_decisions_async(
+                records,
+                [result["prediction"] for result in results],
+                [result["trust"] for result in results],
+                timings,
+                assessment_ids
+            )
+
+        if state["metrics"]:
+            state["metrics"].observe_assessment("/assess/batch", timings, assessment.scores['trust_label'],
+                                                time.perf_counter() - started)
+        if profiling.enabled:
+            capture_request("/assess/batch", started, assessment, mc_samples=request.mc_samples,
+                            assessment_ids=assessment_ids[:10])
+
+        return TrustJSONResponse({"results": results, "timings_ms": timings})
+    except AuditQueueFull as e:
+        record_error("/assess/batch", type(e).__name__)
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        record_error("/assess/batch", type(e).__name__)
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/feedback")
+async def submit_feedback(request: FeedbackRequest):
+    calibration = state["calibration"]
+    if calibration is None:
+        raise HTTPException(status_code=404, detail="Online calibration is disabled.")
+    if not calibration.feedback(request.assessment_id, request.label):
+        raise HTTPException(status_code=404, detail="Unknown, expired or already labelled assessment_id.")
+    return {
+        "accepted": True,
+        "labels": calibration.accumulator.total,
+        "calibration_trust_factor": calibration.trust_factor
+    }
+
 @app.get("/logs")
-async def get_logs(limit: int = 10):
-    return state["logger"].get_recent_logs(limit)
+async def get_logs(limit: int = 10,
+                   trust_label: Optional[str] = None,
+                   since: Optional[datetime] = None,
+                   until: Optional[datetime] = None):
+    # Waits for queued audit writes and reads the index: off the event loop
+    logs = await asyncio.get_running_loop().run_in_executor(
+        None, lambda: state["logger"].query_logs(limit, trust_label=trust_label, since=since, until=until)
+    )
+    return TrustJSONResponse(logs)
+
+@app.get("/stats/batching")
+async def batching_stats():
+    if not state["batcher"]:
+        return {"enabled": False}
+    return {"enabled": True, **state["batcher"].stats()}
+
+@app.get("/stats/cache")
+async def cache_stats():
+    if not state["cache"]:
+        return {"enabled": False}
+    return {"enabled": True, "mode": settings.CACHE_MODE, **state["cache"].stats()}
+
+@app.get("/stats/calibration")
+async def calibration_stats():
+    if not state["calibration"]:
+        return {"enabled": False}
+    return {"enabled": True, **state["calibration"].stats()}
+
+@app.get("/drift")
+async def drift_status(current: bool = False):
+    """
+    Recent drift window reports and alerts. `current=true` also evaluates the open window.
+    """
+    monitor = state["drift"]
+    if not monitor:
+        return {"enabled": False}
+    response = {"enabled": True, **monitor.status()}
+    if current:
+        response["current"] = await asyncio.get_running_loop().run_in_executor(None, monitor.evaluate_current)
+    return TrustJSONResponse(response)
+
+@app.get("/metrics")
+async def metrics():
+    """
+    Prometheus text exposition of the assessment metrics.
+    """
+    if not state["metrics"]:
+        raise HTTPException(status_code=404, detail="Metrics are disabled.")
+    return PlainTextResponse(state["metrics"].render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+def require_admin(token: Optional[str]):
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Admin endpoints are disabled (set ADMIN_TOKEN).")
+    if token is None or not secrets.compare_digest(token.encode(), settings.ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Invalid admin token.")
+
+@app.get("/admin/profiling")
+async def profiling_status(x_admin_token: Optional[str] = Header(None)):
+    require_admin(x_admin_token)
+    return state["profiling"].status()
+
+@app.post("/admin/profiling")
+async def configure_profiling(request: ProfilingRequest, x_admin_token: Optional[str] = Header(None)):
+    """
+    Switches request profiling on or off at runtime. Unset fields keep their current value.
+    """
+    require_admin(x_admin_token)
+    try:
+        state["profiling"].configure(request.enabled, request.sample_rate, request.slow_ms, request.mode)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return state["profiling"].status()
+
+@app.get("/admin/profiling/captures/{name}")
+async def profiling_capture(name: str, x_admin_token: Optional[str] = Header(None)):
+    require_admin(x_admin_token)
+    try:
+        return Response(state["profiling"].read(name), media_type="application/json")
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"No capture named '{name}'.")
 
 @app.get("/health")
 async def health():
-    return {"status": "healthy", "version": "1.0.0"}
+    if state["ready"]:
+        return {"status": "healthy", "version": "1.0.0", "startup_ms": state["startup_ms"]}
+    # Not ready yet (or failed): 503 keeps load balancers from routing traffic here
+    status = "unavailable" if state["startup_error"] else "starting"
+    return TrustJSONResponse(
+        {"status": status, "version": "1.0.0", "error": state["startup_error"]},
+        status_code=503
+    )
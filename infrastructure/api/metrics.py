@@ -0,0 +1,119 @@
+import bisect
+from typing import Dict, List, Tuple
+
+# Latency buckets in seconds (100us .. 2.5s): the pipeline stages run from tens of microseconds
+# (trust score) to tens of milliseconds (large MC Dropout batches)
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+class Counter:
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        self.values[labels] = self.values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_labels(self.label_names, labels)} {value:g}")
+        return lines
+
+class Histogram:
+    """
+    Fixed-bucket histogram. Observing is one bisect and two additions per value; buckets are
+    stored per bucket and only made cumulative when rendered.
+    """
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...] = (), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts (+Inf last), sum]
+        self.series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels: str):
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total) in sorted(self.series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound:g}"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {total:.6f}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {cumulative}")
+        return lines
+
+class AssessmentMetrics:
+    """
+    Prometheus metrics for the assessment path, rendered in the text exposition format.
+
+    Stage and signal timings come from the `timings_ms` each worker returns with its result,
+    so recording costs a few dict lookups per request and nothing is measured twice.
+    Metrics are recorded from the event loop only, so no locking is needed.
+    """
+
+    # Pipeline steps (timings_ms keys) and the sub-signals inside them
+    STAGES = ("predictions", "uncertainty", "trust_score", "explanation", "logging", "batch_wait")
+    SIGNALS = {"predict_rf": "rf", "predict_lr": "lr", "predict_nn": "nn",
+               "mc_dropout": "mc_dropout", "similarity": "similarity"}
+
+    def __init__(self):
+        self.stage_seconds = Histogram(
+            "trustscope_stage_duration_seconds", "Duration of each assessment pipeline step.", ("stage",))
+        self.signal_seconds = Histogram(
+            "trustscope_signal_duration_seconds",
+            "Duration of each trust sub-signal (ensemble models, MC Dropout, OOD similarity).", ("signal",))
+        self.request_seconds = Histogram(
+            "trustscope_request_duration_seconds", "End-to-end handler duration.", ("endpoint",))
+        self.assessments = Counter(
+            "trustscope_assessments_total", "Assessed rows by trust label.", ("trust_label",))
+        self.errors = Counter(
+            "trustscope_errors_total", "Failed requests by endpoint and error type.", ("endpoint", "error_type"))
+        self.cache = Counter(
+            "trustscope_cache_lookups_total", "Assessment cache outcomes.", ("outcome",))
+
+    def observe_assessment(self, endpoint: str, timings_ms: Dict[str, float], trust_labels, seconds: float):
+        for stage in self.STAGES:
+            value = timings_ms.get(stage)
+            if value is not None:
+                self.stage_seconds.observe(value / 1000.0, stage)
+        for key, signal in self.SIGNALS.items():
+            value = timings_ms.get(key)
+            if value is not None:
+                self.signal_seconds.observe(value / 1000.0, signal)
+        self.request_seconds.observe(seconds, endpoint)
+        for label in trust_labels:
+            self.assessments.inc(str(label))
+
+    def observe_error(self, endpoint: str, error_type: str):
+        self.errors.inc(endpoint, error_type)
+
+    def observe_cache(self, outcome: str):
+        self.cache.inc(outcome)
+
+    def render(self) -> str:
+        lines = []
+        for metric in (self.stage_seconds, self.signal_seconds, self.request_seconds,
+                       self.assessments, self.errors, self.cache):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,224 @@
+import cProfile
+import io
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from infrastructure import encoding
+
+MODES = ("stack", "cprofile")
+
+# Stack profile of a call that ended before the sampler thread got the GIL (short requests,
+# mostly in thread mode); the capture still holds the span trace
+NO_SAMPLES = "# no stack samples collected: the call finished within one sampling interval (mode=cprofile covers short requests)"
+
+# How timings_ms keys nest: pipeline steps and the sub-signals measured inside them
+SPAN_TREE = {
+    "batch_wait": (),
+    "predictions": ("predict_rf", "predict_lr", "predict_nn"),
+    "uncertainty": ("mc_dropout", "similarity"),
+    "trust_score": (),
+    "explanation": (),
+    "logging": (),
+}
+
+class StackSampler:
+    """
+    Samples the calling thread's Python stack every `interval` seconds from a helper thread
+    and counts collapsed stacks ("outer;...;inner" -> samples), the input format of
+    flamegraph.pl and speedscope. Torch and numpy release the GIL inside kernels, so the
+    sampler keeps running while the profiled thread is busy in native code. Frames above the
+    `with` block (thread/worker bootstrap) are left out.
+    """
+
+    def __init__(self, interval: float = 0.001):
+        self.interval = interval
+        self.stacks = Counter()
+        self._target = None
+        self._root = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self) -> "StackSampler":
+        self._target = threading.get_ident()
+        self._root = sys._getframe(1)
+        self._thread = threading.Thread(target=self._run, name="trustscope-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self._root = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            stack = []
+            while frame is not None and frame is not self._root:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            # Woken after the call returned: the target is in __exit__, not in the profiled code
+            if self._stop.is_set():
+                break
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+def profile_call(mode: str, fn: Callable, *args, interval: float = 0.001, **kwargs) -> Tuple[Any, str]:
+    """
+    Runs `fn` under the chosen profiler and returns (result, profile text):
+    collapsed stacks for "stack" (NO_SAMPLES if none were taken), the top of a cumulative-time
+    pstats report for "cprofile".
+    """
+    if mode == "stack":
+        with StackSampler(interval) as sampler:
+            result = fn(*args, **kwargs)
+        return result, sampler.collapsed() or NO_SAMPLES
+    if mode == "cprofile":
+        profiler = cProfile.Profile()
+        result = profiler.runcall(fn, *args, **kwargs)
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(40)
+        return result, out.getvalue()
+    raise ValueError(f"Unknown profiling mode '{mode}'. Expected one of {MODES}.")
+
+def span_trace(timings_ms: Dict[str, float]) -> List[Dict[str, Any]]:
+    """
+    The flat per-request timings as nested spans (pipeline step -> sub-signals).
+    """
+    spans = []
+    for name, children in SPAN_TREE.items():
+        if name not in timings_ms:
+            continue
+        spans.append({
+            "name": name,
+            "ms": timings_ms[name],
+            "children": [{"name": child, "ms": timings_ms[child]} for child in children if child in timings_ms]
+        })
+    return spans
+
+class RequestProfiler:
+    """
+    Captures diagnostics for individual assessments into a rotating local directory.
+
+    - A `sample_rate` fraction of requests runs with a profiler (`mode`) around the pipeline
+      call in the inference worker; the capture holds the profile and the span trace.
+    - Any request slower than `slow_ms` gets its span trace captured after the fact.
+
+    Disabled (the default), the request path only reads `enabled`. At most `max_files`
+    captures are kept; the oldest are deleted. Settings can be changed at runtime.
+    """
+
+    def __init__(self, directory: str = "data/profiles", enabled: bool = False, sample_rate: float = 0.0,
+                 slow_ms: float = 0.0, mode: str = "stack", max_files: int = 200, interval_ms: float = 1.0):
+        self.directory = directory
+        self.max_files = max_files
+        self.enabled = False
+        self.sample_rate = 0.0
+        self.slow_ms = 0.0
+        self.mode = "stack"
+        self.interval_ms = interval_ms
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.captures_written = 0
+        self.captures_deleted = 0
+
+        self.configure(enabled=enabled, sample_rate=sample_rate, slow_ms=slow_ms, mode=mode)
+
+    def configure(self, enabled: bool = None, sample_rate: float = None, slow_ms: float = None, mode: str = None):
+        if mode is not None and mode not in MODES:
+            raise ValueError(f"Unknown profiling mode '{mode}'. Expected one of {MODES}.")
+        if sample_rate is not None and not 0.0 <= sample_rate <= 1.0:
+            raise ValueError("sample_rate must be between 0 and 1.")
+        self.sample_rate = self.sample_rate if sample_rate is None else sample_rate
+        self.slow_ms = self.slow_ms if slow_ms is None else slow_ms
+        self.mode = mode or self.mode
+        # Turned on only if there is something to capture
+        enabled = self.enabled if enabled is None else enabled
+        self.enabled = bool(enabled and (self.sample_rate > 0 or self.slow_ms > 0))
+
+    def sample(self) -> Optional[str]:
+        """
+        The profiling mode to run this request with, or None.
+        """
+        if self.sample_rate and random.random() < self.sample_rate:
+            return self.mode
+        return None
+
+    def should_capture(self, profiled: bool, total_ms: float) -> bool:
+        return profiled or (self.slow_ms > 0 and total_ms >= self.slow_ms)
+
+    def capture(self, endpoint: str, total_ms: float, timings_ms: Dict[str, float], profile: str = None,
+                **details) -> str:
+        """
+        Writes one capture (JSON) and rotates the directory. Returns the capture name.
+        """
+        now = time.time()
+        stamp = time.strftime('%Y%m%dT%H%M%S', time.gmtime(now)) + f"{int(now * 1000) % 1000:03d}"
+        name = f"{stamp}-{'profile' if profile is not None else 'slow'}-{uuid.uuid4().hex[:8]}.json"
+        record = {
+            "endpoint": endpoint,
+            "timestamp": now,
+            "total_ms": round(total_ms, 3),
+            "slow_ms_threshold": self.slow_ms or None,
+            "spans": span_trace(timings_ms),
+            "timings_ms": timings_ms,
+            **details
+        }
+        if profile is not None:
+            record["profile_mode"] = self.mode
+            record["profile"] = profile
+
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, name)
+            with open(path + ".tmp", "wb") as f:
+                f.write(encoding.dumps(record))
+            os.replace(path + ".tmp", path)
+            self.captures_written += 1
+            self._rotate()
+        return name
+
+    def captures(self) -> List[str]:
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(name for name in os.listdir(self.directory) if name.endswith(".json"))
+
+    def read(self, name: str) -> bytes:
+        # Only plain names from captures(): no path traversal
+        if name not in self.captures():
+            raise FileNotFoundError(name)
+        with open(os.path.join(self.directory, name), "rb") as f:
+            return f.read()
+
+    def status(self) -> Dict[str, Any]:
+        captures = self.captures()
+        return {
+            "enabled": self.enabled,
+            "sample_rate": self.sample_rate,
+            "slow_ms": self.slow_ms,
+            "mode": self.mode,
+            "directory": self.directory,
+            "max_files": self.max_files,
+            "captures_written": self.captures_written,
+            "captures_deleted": self.captures_deleted,
+            "captures": captures[-20:]
+        }
+
+    def _rotate(self):
+        # Names start with a UTC timestamp, so sorted order is age order
+        captures = self.captures()
+        for name in captures[:max(0, len(captures) - self.max_files)]:
+            os.remove(os.path.join(self.directory, name))
+            self.captures_deleted += 1
@@ -0,0 +1,135 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict
+
+import numpy as np
+
+from core.trust.results import AssessmentBatch
+
+# Per-process pipeline, built once by the worker initializer
+_pipeline = None
+
+def _init_worker(profiler_path: str, model_dir: str, torch_threads: int, backend: str = "eager",
+                 ood_method: str = None):
+    global _pipeline
+    import torch
+    from core.trust.pipeline import TrustPipeline
+
+    torch.set_num_threads(torch_threads)
+    _pipeline = TrustPipeline.from_artifacts(profiler_path, model_dir, backend, ood_method)
+
+def _assess(X_input: np.ndarray, num_samples: int, mc_tolerance: float, deterministic: Dict[str, Any] = None,
+            profile: str = None, profile_interval_ms: float = 1.0):
+    # Columnar AssessmentBatch: rendering to dicts happens in the API process
+    if profile:
+        # Profiled where the pipeline actually runs (see RequestProfiler)
+        from infrastructure.api.profiling import profile_call
+
+        result, result_profile = profile_call(
+            profile, _pipeline.assess_batch, X_input, num_samples=num_samples, mc_tolerance=mc_tolerance,
+            deterministic=deterministic, interval=profile_interval_ms / 1000.0
+        )
+        result.profile = result_profile
+    else:
+        result = _pipeline.assess_batch(X_input, num_samples=num_samples, mc_tolerance=mc_tolerance, deterministic=deterministic)
+    result.worker_pid = os.getpid()
+    return result
+
+def _warm_up() -> Dict[str, Any]:
+    """
+    Runs one inference on the training means (first-call allocations, torch kernels) and
+    reports what this worker serves.
+    """
+    profiler = _pipeline.profiler
+    X_warm = np.array([[profiler.feature_stats[f]['mean'] for f in profiler.feature_names]])
+    _pipeline.assess_batch(X_warm)
+    return {
+        "worker_pid": os.getpid(),
+        "feature_names": list(profiler.feature_names),
+        "model_version": _pipeline.model_manager.version,
+        "backend": _pipeline.model_manager.backend,
+        "profiler_version": profiler.version,
+        "ood_method": profiler.ood_method,
+        "trust_weights": dict(_pipeline.trust_engine.weights),
+        "drift_reference": profiler.drift_reference()
+    }
+
+class InferencePool:
+    """
+    Runs CPU-bound trust assessments off the event loop.
+
+    Modes:
+      - "process": a pool of worker processes, each loading the artifacts once at startup
+                   and pinned to `torch_threads` intra-op threads; scales with cores.
+      - "thread":  a thread pool sharing the caller's pipeline (torch/numpy release the GIL).
+      - "inline":  runs on the caller's thread (debugging / tests).
+    """
+
+    MODES = ("process", "thread", "inline")
+
+    def __init__(self,
+                 pipeline=None,
+                 mode: str = "process",
+                 workers: int = None,
+                 torch_threads: int = 1,
+                 profiler_path: str = "data/profiler.joblib",
+                 model_dir: str = "data/models",
+                 backend: str = "eager",
+                 ood_method: str = None):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown inference mode '{mode}'. Expected one of {self.MODES}.")
+        if mode != "process" and pipeline is None:
+            raise ValueError(f"Inference mode '{mode}' needs a loaded pipeline.")
+
+        self.mode = mode
+        self.workers = 1 if mode == "inline" else workers or max(1, (os.cpu_count() or 1) // torch_threads)
+        self.executor = None
+
+        if mode == "process":
+            # spawn: never fork a parent that already initialized torch/OpenMP thread pools
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(profiler_path, model_dir, torch_threads, backend, ood_method)
+            )
+        else:
+            global _pipeline
+            import torch
+            torch.set_num_threads(torch_threads)
+            _pipeline = pipeline
+            if mode == "thread":
+                self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="trustscope-inference")
+
+    def warm_up(self) -> Dict[str, Any]:
+        """
+        Starts every worker (and so loads its artifacts) and runs a warm-up inference
+        before traffic arrives. Returns the feature names and artifact versions served.
+        """
+        if self.executor is None:
+            return _warm_up()
+        futures = [self.executor.submit(_warm_up) for _ in range(self.workers)]
+        return [future.result() for future in futures][0]
+
+    async def assess(self,
+                     X_input: np.ndarray,
+                     num_samples: int = 50,
+                     mc_tolerance: float = None,
+                     deterministic: Dict[str, Any] = None,
+                     profile: str = None,
+                     profile_interval_ms: float = 1.0) -> AssessmentBatch:
+        """
+        Runs TrustPipeline.assess_batch on a worker. `deterministic` carries cached ensemble/OOD signals.
+        `profile` ("stack" or "cprofile") profiles the call; the result's `profile` holds the output.
+        """
+        args = (X_input, num_samples, mc_tolerance, deterministic, profile, profile_interval_ms)
+        if self.executor is None:
+            return _assess(*args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, _assess, *args)
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
@@ -0,0 +1,98 @@
+"""
+Runtime configuration for the TRUSTSCOPE service.
+Every value can be overridden with a TRUSTSCOPE_* environment variable.
+"""
+import os
+
+def _env(name: str, default, cast=str):
+    value = os.getenv(f"TRUSTSCOPE_{name}")
+    if value is None:
+        return default
+    if cast is bool:
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    return cast(value)
+
+# Audit logging
+LOG_DIR = _env("LOG_DIR", "data/logs")
+AUDIT_ASYNC = _env("AUDIT_ASYNC", True, bool)
+AUDIT_QUEUE_SIZE = _env("AUDIT_QUEUE_SIZE", 10000, int)
+AUDIT_BATCH_SIZE = _env("AUDIT_BATCH_SIZE", 512, int)
+# "always" = fsync every grouped write, "interval" = at most every AUDIT_FSYNC_INTERVAL s, "never"
+AUDIT_FSYNC = _env("AUDIT_FSYNC", "interval")
+AUDIT_FSYNC_INTERVAL = _env("AUDIT_FSYNC_INTERVAL", 1.0, float)
+# Seconds a request may wait for queue space before the write is rejected
+AUDIT_PUT_TIMEOUT = _env("AUDIT_PUT_TIMEOUT", 5.0, float)
+# Rotation: a new segment every AUDIT_ROTATE_BYTES (0 = off) and/or every UTC day.
+# Rotated segments are compacted to "gzip", "zstd" (zstandard) or "parquet" (pyarrow).
+AUDIT_ROTATE_BYTES = _env("AUDIT_ROTATE_BYTES", 64 * 1024 * 1024, int)
+AUDIT_ROTATE_DAILY = _env("AUDIT_ROTATE_DAILY", True, bool)
+AUDIT_ARCHIVE_FORMAT = _env("AUDIT_ARCHIVE_FORMAT", "gzip")
+
+# Artifacts
+PROFILER_PATH = _env("PROFILER_PATH", "data/profiler.joblib")
+MODEL_DIR = _env("MODEL_DIR", "data/models")
+
+# Inference execution: "process" (worker pool), "thread" or "inline"
+INFERENCE_MODE = _env("INFERENCE_MODE", "process")
+# Worker count; 0 = one per core (divided by TORCH_THREADS)
+INFERENCE_WORKERS = _env("INFERENCE_WORKERS", 0, int)
+# Intra-op torch threads per worker; 1 avoids oversubscribing cores across workers
+TORCH_THREADS = _env("TORCH_THREADS", 1, int)
+# NN inference backend: "eager" (reference SimpleNN), "fused" (cheaper MC Dropout) or
+# "script" (fused + TorchScript). Non-eager backends are parity-checked at load.
+INFERENCE_BACKEND = _env("INFERENCE_BACKEND", "eager")
+# OOD signal: "mahalanobis" or "knn" (kNN distance; needs the index saved next to the
+# profiler). Empty = whatever the profiler was saved with.
+OOD_METHOD = _env("OOD_METHOD", "")
+
+# Prometheus metrics (GET /metrics): per-stage/sub-signal latency histograms and counters
+METRICS_ENABLED = _env("METRICS_ENABLED", True, bool)
+
+# Admin endpoints (/admin/*) require this token in the X-Admin-Token header; empty = disabled
+ADMIN_TOKEN = _env("ADMIN_TOKEN", "")
+# Per-request diagnostics written to PROFILING_DIR (see RequestProfiler); also adjustable at
+# runtime through POST /admin/profiling. A PROFILING_SAMPLE_RATE fraction of requests is
+# profiled ("stack" sampling or "cprofile"); requests over PROFILING_SLOW_MS (0 = off) get
+# their span trace captured.
+PROFILING_ENABLED = _env("PROFILING_ENABLED", False, bool)
+PROFILING_SAMPLE_RATE = _env("PROFILING_SAMPLE_RATE", 0.0, float)
+PROFILING_SLOW_MS = _env("PROFILING_SLOW_MS", 0.0, float)
+PROFILING_MODE = _env("PROFILING_MODE", "stack")
+PROFILING_INTERVAL_MS = _env("PROFILING_INTERVAL_MS", 1.0, float)
+PROFILING_DIR = _env("PROFILING_DIR", "data/profiles")
+PROFILING_MAX_FILES = _env("PROFILING_MAX_FILES", 200, int)
+
+# Micro-batching of concurrent single-row /assess calls
+BATCHING_ENABLED = _env("BATCHING_ENABLED", True, bool)
+BATCH_MAX_SIZE = _env("BATCH_MAX_SIZE", 64, int)
+BATCH_MAX_WAIT_MS = _env("BATCH_MAX_WAIT_MS", 2.0, float)
+
+# Opt-in cache of /assess results keyed by feature vector + model/profiler versions.
+# "deterministic" caches only ensemble/OOD signals (MC Dropout still runs per request);
+# "full" also caches the complete response, so repeated inputs reuse one MC Dropout draw.
+CACHE_ENABLED = _env("CACHE_ENABLED", False, bool)
+CACHE_MODE = _env("CACHE_MODE", "deterministic")
+CACHE_MAX_ENTRIES = _env("CACHE_MAX_ENTRIES", 10000, int)
+CACHE_TTL_SECONDS = _env("CACHE_TTL_SECONDS", 300.0, float)
+
+# Online calibration from delayed labels (POST /feedback). The ECE-derived trust factor
+# joins the trust score (calibration weight) once CALIBRATION_MIN_LABELS labels arrived.
+CALIBRATION_ENABLED = _env("CALIBRATION_ENABLED", True, bool)
+CALIBRATION_BINS = _env("CALIBRATION_BINS", 10, int)
+CALIBRATION_MIN_LABELS = _env("CALIBRATION_MIN_LABELS", 200, int)
+# Assessments awaiting a label; the oldest are dropped beyond this
+CALIBRATION_MAX_PENDING = _env("CALIBRATION_MAX_PENDING", 100000, int)
+CALIBRATION_STATE_PATH = _env("CALIBRATION_STATE_PATH", "data/calibration.json")
+
+# Live input drift monitoring over tumbling windows of assessed rows (GET /drift).
+# A window closes after DRIFT_WINDOW_SIZE rows or DRIFT_WINDOW_SECONDS (0 = size only).
+DRIFT_ENABLED = _env("DRIFT_ENABLED", True, bool)
+DRIFT_WINDOW_SIZE = _env("DRIFT_WINDOW_SIZE", 500, int)
+DRIFT_WINDOW_SECONDS = _env("DRIFT_WINDOW_SECONDS", 0.0, float)
+# PSI is noisy on small windows; shorter (time-closed) windows are not evaluated
+DRIFT_MIN_ROWS = _env("DRIFT_MIN_ROWS", 100, int)
+# Alert when a feature's PSI exceeds this (0.2 = significant shift) ...
+DRIFT_PSI_THRESHOLD = _env("DRIFT_PSI_THRESHOLD", 0.2, float)
+# ... or a KS / mean-shift test rejects at this level
+DRIFT_P_VALUE = _env("DRIFT_P_VALUE", 0.01, float)
+DRIFT_HISTORY = _env("DRIFT_HISTORY", 24, int)
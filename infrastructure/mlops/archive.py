@@ -0,0 +1,243 @@
+import gzip
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from infrastructure import encoding
+from infrastructure.mlops.audit_index import (
+    INDEX_DTYPE, LABEL_NAMES, contiguous_runs, filter_index, parse_block, read_index
+)
+
+class SegmentArchive:
+    """
+    Rotated audit log segments plus a JSON manifest describing them.
+
+    A rotated segment is registered immediately as plain JSONL (so it stays queryable) and
+    compacted in the background to one of:
+      - "gzip"    : gzip-compressed JSONL + offset index (stdlib, default)
+      - "zstd"    : zstd-compressed JSONL + offset index (requires `zstandard`)
+      - "parquet" : zstd-compressed Parquet with timestamp/label/score columns plus the raw
+                    entry (requires `pyarrow`)
+    Each manifest entry records the segment's time range, row count and per-label counts,
+    so queries can skip segments that cannot match.
+    """
+
+    FORMATS = ("gzip", "zstd", "parquet")
+    EXTENSIONS = {"gzip": ".jsonl.gz", "zstd": ".jsonl.zst", "parquet": ".parquet"}
+
+    def __init__(self, archive_dir: str, archive_format: str = "gzip"):
+        if archive_format not in self.FORMATS:
+            raise ValueError(f"Unknown archive format '{archive_format}'. Expected one of {self.FORMATS}.")
+        # Fail fast if the optional dependency is missing, not later in the background compactor
+        try:
+            if archive_format == "zstd":
+                import zstandard  # noqa: F401
+            elif archive_format == "parquet":
+                import pyarrow.parquet  # noqa: F401
+        except ImportError as e:
+            raise ImportError(f"Archive format '{archive_format}' requires an optional dependency: {e}") from e
+
+        self.archive_dir = archive_dir
+        self.archive_format = archive_format
+        self.manifest_path = os.path.join(archive_dir, "manifest.json")
+        os.makedirs(archive_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="trustscope-audit-compactor")
+
+        # Resume compaction of segments rotated before an unclean shutdown
+        for segment in self.segments():
+            if segment["format"] == "jsonl":
+                self._schedule_compaction(segment["name"])
+
+    def segments(self) -> List[Dict[str, Any]]:
+        """
+        Manifest entries, oldest first.
+        """
+        with self._lock:
+            return list(self._load_manifest()["segments"])
+
+    def add(self, log_path: str, index_path: str, name: str):
+        """
+        Moves a closed JSONL segment and its index into the archive and schedules compaction.
+        """
+        index = read_index(index_path)
+        data_file, index_file = f"{name}.jsonl", f"{name}.idx"
+        os.replace(log_path, os.path.join(self.archive_dir, data_file))
+        os.replace(index_path, os.path.join(self.archive_dir, index_file))
+
+        labels, counts = np.unique(index["label"], return_counts=True)
+        segment = {
+            "name": name,
+            "format": "jsonl",
+            "data": data_file,
+            "index": index_file,
+            "first_ts": float(index["timestamp"].min()) if len(index) else 0.0,
+            "last_ts": float(index["timestamp"].max()) if len(index) else 0.0,
+            "count": int(len(index)),
+            "labels": {LABEL_NAMES.get(int(l), "UNKNOWN"): int(c) for l, c in zip(labels, counts)},
+            "bytes": os.path.getsize(os.path.join(self.archive_dir, data_file))
+        }
+        with self._lock:
+            manifest = self._load_manifest()
+            manifest["segments"].append(segment)
+            self._save_manifest(manifest)
+        self._schedule_compaction(name)
+
+    def query(self,
+              limit: int,
+              trust_label: Optional[str] = None,
+              since: Optional[float] = None,
+              until: Optional[float] = None,
+              segments: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+        """
+        Up to `limit` most recent matching entries across archived segments (oldest first).
+        `segments` restricts the query to a snapshot taken earlier with segments().
+        """
+        results = []
+        for segment in reversed(self.segments() if segments is None else segments):
+            remaining = limit - len(results)
+            if remaining <= 0:
+                break
+            if since is not None and segment["last_ts"] < since:
+                break  # Segments are chronological; everything older is out of range too
+            if until is not None and segment["first_ts"] > until:
+                continue
+            if trust_label is not None and not segment["labels"].get(trust_label.upper()):
+                continue
+            try:
+                entries = self._read_segment(segment, remaining, trust_label, since, until)
+            except FileNotFoundError:
+                # Compacted while we were reading it: retry against the updated manifest entry
+                segment = next(s for s in self.segments() if s["name"] == segment["name"])
+                entries = self._read_segment(segment, remaining, trust_label, since, until)
+            results = entries + results
+        return results
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+    def _read_segment(self, segment, limit, trust_label, since, until) -> List[Dict[str, Any]]:
+        data_path = os.path.join(self.archive_dir, segment["data"])
+
+        if segment["format"] == "parquet":
+            import pyarrow.parquet as pq
+            table = pq.read_table(data_path, columns=["timestamp", "label", "entry"])
+            index = np.zeros(table.num_rows, dtype=INDEX_DTYPE)
+            index["offset"] = np.arange(table.num_rows)
+            index["timestamp"] = table.column("timestamp").to_numpy()
+            index["label"] = table.column("label").to_numpy()
+            selected = filter_index(index, trust_label, since, until)[-limit:]
+            entries = table.column("entry").take(selected["offset"]).to_pylist()
+            return [encoding.loads(entry) for entry in entries]
+
+        selected = filter_index(read_index(os.path.join(self.archive_dir, segment["index"])),
+                                trust_label, since, until)[-limit:]
+        if not len(selected):
+            return []
+
+        if segment["format"] == "jsonl":
+            entries = []
+            with open(data_path, "rb") as f:
+                for offset, length in contiguous_runs(selected):
+                    f.seek(offset)
+                    entries.extend(parse_block(f.read(length)))
+            return entries
+
+        # Compressed JSONL: decompress once, then slice the selected lines out of the buffer
+        with open(data_path, "rb") as f:
+            raw = self._decompress(f.read(), segment["format"])
+        entries = []
+        for offset, length in contiguous_runs(selected):
+            entries.extend(parse_block(raw[offset:offset + length]))
+        return entries
+
+    def _schedule_compaction(self, name: str):
+        future = self._executor.submit(self._compact, name)
+        future.add_done_callback(lambda f: self._compaction_done(f, name))
+
+    @staticmethod
+    def _compaction_done(future, name: str):
+        error = None if future.cancelled() else future.exception()
+        if error is not None:
+            # The segment stays queryable as plain JSONL; compaction is retried on the next start
+            logging.getLogger("TrustScope").error(
+                f"Compaction of audit segment {name} failed: {type(error).__name__}: {error}")
+
+    def _compact(self, name: str):
+        with self._lock:
+            segment = next((s for s in self._load_manifest()["segments"] if s["name"] == name), None)
+        if segment is None or segment["format"] != "jsonl":
+            return
+
+        src = os.path.join(self.archive_dir, segment["data"])
+        data_file = name + self.EXTENSIONS[self.archive_format]
+        dst = os.path.join(self.archive_dir, data_file)
+        tmp = dst + ".tmp"
+
+        with open(src, "rb") as f:
+            raw = f.read()
+        if self.archive_format == "parquet":
+            self._write_parquet(raw, os.path.join(self.archive_dir, segment["index"]), tmp)
+        else:
+            with open(tmp, "wb") as f:
+                f.write(self._compress(raw, self.archive_format))
+        os.replace(tmp, dst)
+
+        with self._lock:
+            manifest = self._load_manifest()
+            for s in manifest["segments"]:
+                if s["name"] == name:
+                    s.update({"format": self.archive_format, "data": data_file, "bytes": os.path.getsize(dst)})
+            self._save_manifest(manifest)
+
+        os.remove(src)
+        if self.archive_format == "parquet":
+            os.remove(os.path.join(self.archive_dir, segment["index"]))
+
+    @staticmethod
+    def _write_parquet(raw: bytes, index_path: str, dst: str):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        index = read_index(index_path)
+        lines = raw.splitlines()
+        entries = [encoding.loads(line) for line in lines]
+        table = pa.table({
+            "timestamp": index["timestamp"],
+            "label": index["label"],
+            "trust_score": [e.get("trust", {}).get("trust_score") for e in entries],
+            "entry": [line.decode("utf-8") for line in lines]
+        })
+        pq.write_table(table, dst, compression="zstd")
+
+    @staticmethod
+    def _compress(raw: bytes, archive_format: str) -> bytes:
+        if archive_format == "zstd":
+            import zstandard
+            return zstandard.ZstdCompressor(level=10).compress(raw)
+        return gzip.compress(raw, compresslevel=6)
+
+    @staticmethod
+    def _decompress(raw: bytes, archive_format: str) -> bytes:
+        if archive_format == "zstd":
+            import zstandard
+            return zstandard.ZstdDecompressor().decompress(raw)
+        return gzip.decompress(raw)
+
+    def _load_manifest(self) -> Dict[str, Any]:
+        if not os.path.exists(self.manifest_path):
+            return {"segments": []}
+        with open(self.manifest_path) as f:
+            return json.load(f)
+
+    def _save_manifest(self, manifest: Dict[str, Any]):
+        tmp = self.manifest_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp, self.manifest_path)
@@ -0,0 +1,82 @@
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from infrastructure import encoding
+
+# One fixed-width record per audit line: where it lives in the JSONL stream and what to filter on
+INDEX_DTYPE = np.dtype([
+    ("offset", "<u8"),
+    ("length", "<u4"),
+    ("timestamp", "<f8"),
+    ("label", "u1")
+])
+LABEL_CODES = {"SAFE": 1, "REVIEW": 2, "UNSAFE": 3}  # 0 = unknown
+LABEL_NAMES = {code: label for label, code in LABEL_CODES.items()}
+
+# (serialized newline-terminated JSONL line, UTC epoch seconds, trust label)
+AuditRecord = Tuple[bytes, float, str]
+
+def to_epoch(value) -> float:
+    """
+    Converts a datetime or ISO-8601 string to UTC epoch seconds. Naive values are treated as UTC.
+    """
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+def read_index(path: str) -> np.ndarray:
+    if not os.path.exists(path):
+        return np.empty(0, dtype=INDEX_DTYPE)
+    count = os.path.getsize(path) // INDEX_DTYPE.itemsize
+    return np.fromfile(path, dtype=INDEX_DTYPE, count=count)
+
+def filter_index(index: np.ndarray,
+                 trust_label: Optional[str] = None,
+                 since: Optional[float] = None,
+                 until: Optional[float] = None) -> np.ndarray:
+    """
+    Selects index records by label and inclusive epoch range with vectorized masks.
+    """
+    if trust_label is None and since is None and until is None:
+        return index
+    mask = np.ones(len(index), dtype=bool)
+    if trust_label is not None:
+        mask &= index["label"] == LABEL_CODES.get(trust_label.upper(), 0)
+    if since is not None:
+        mask &= index["timestamp"] >= since
+    if until is not None:
+        mask &= index["timestamp"] <= until
+    return index[mask]
+
+def contiguous_runs(selected: np.ndarray):
+    """
+    Yields (start_offset, byte_length) for runs of adjacent lines, so each run is one read.
+    """
+    start = 0
+    while start < len(selected):
+        end = start + 1
+        while end < len(selected) and selected["offset"][end] == selected["offset"][end - 1] + selected["length"][end - 1]:
+            end += 1
+        first = int(selected["offset"][start])
+        yield first, int(selected["offset"][end - 1] + selected["length"][end - 1]) - first
+        start = end
+
+def parse_block(block: bytes) -> List[Dict[str, Any]]:
+    return [encoding.loads(line) for line in block.splitlines() if line]
+
+def index_record(raw: bytes, offset: int) -> tuple:
+    """
+    Builds an index record for one serialized line (used when indexing existing logs).
+    """
+    try:
+        entry = encoding.loads(raw)
+        timestamp = to_epoch(entry["timestamp"])
+        label = LABEL_CODES.get(entry.get("trust", {}).get("trust_label"), 0)
+    except (ValueError, KeyError, TypeError, AttributeError):
+        timestamp, label = 0.0, 0
+    return (offset, len(raw), timestamp, label)
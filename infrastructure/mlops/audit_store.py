@@ -0,0 +1,189 @@
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from infrastructure.mlops.archive import SegmentArchive
+from infrastructure.mlops.audit_index import (
+    INDEX_DTYPE, LABEL_CODES, AuditRecord, contiguous_runs, filter_index,
+    index_record, parse_block, read_index
+)
+
+class AuditLogStore:
+    """
+    Append-only JSONL audit file with a binary sidecar offset index (`<file>.idx`).
+
+    Every appended line gets an index record (byte offset, length, timestamp, label code),
+    so recent-N and label/time-range queries scan the compact index with numpy and then
+    seek straight to the matching lines; only the returned lines are parsed.
+    A missing or stale index (e.g. logs written before indexing existed) is rebuilt
+    from the JSONL file on first use.
+
+    With `max_bytes` and/or `rotate_daily`, the active file is rotated into a SegmentArchive
+    (under `<log_dir>/archive`) and compacted in the background. Queries read the active
+    file first and then fall back to archived segments, newest first.
+    """
+
+    def __init__(self,
+                 log_path: str,
+                 max_bytes: Optional[int] = None,
+                 rotate_daily: bool = False,
+                 archive_format: str = "gzip"):
+        self.log_path = log_path
+        self.index_path = log_path + ".idx"
+        self.max_bytes = max_bytes
+        self.rotate_daily = rotate_daily
+        self.archive = None
+        if max_bytes or rotate_daily:
+            self.archive = SegmentArchive(os.path.join(os.path.dirname(log_path), "archive"), archive_format)
+
+        self._lock = threading.RLock()
+        self._log = None
+        self._index = None
+        self._segment_day = None
+
+    def append(self, records: List[AuditRecord]):
+        if not records:
+            return
+        with self._lock:
+            self._open()
+            if self._should_rotate(records[0][1]):
+                self._rotate()
+                self._open()
+
+            offset = self._log.tell()
+            index = np.empty(len(records), dtype=INDEX_DTYPE)
+            chunks = []
+            for i, (raw, timestamp, label) in enumerate(records):
+                index[i] = (offset, len(raw), timestamp, LABEL_CODES.get(label, 0))
+                offset += len(raw)
+                chunks.append(raw)
+
+            self._log.write(b"".join(chunks))
+            self._log.flush()
+            self._index.write(index.tobytes())
+            self._index.flush()
+            if self._segment_day is None:
+                self._segment_day = self._day(records[0][1])
+
+    def fsync(self):
+        with self._lock:
+            if self._log:
+                os.fsync(self._log.fileno())
+                os.fsync(self._index.fileno())
+
+    def close(self):
+        with self._lock:
+            self._close_files()
+        if self.archive:
+            self.archive.close()
+
+    def query(self,
+              limit: int = 10,
+              trust_label: Optional[str] = None,
+              since: Optional[float] = None,
+              until: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Returns up to `limit` most recent entries (oldest first) matching the filters,
+        across the active file and any archived segments.
+        `since`/`until` are inclusive UTC epoch seconds.
+        """
+        if limit <= 0:
+            return []
+
+        entries = []
+        segments = None
+        with self._lock:
+            if os.path.exists(self.log_path):
+                if self._log is None:
+                    self._sync_index()
+                selected = filter_index(read_index(self.index_path), trust_label, since, until)[-limit:]
+                entries = self._read_entries(selected)
+            # Segments as of the active-file read: entries rotated out after it are not read twice
+            if self.archive:
+                segments = self.archive.segments()
+
+        if segments and len(entries) < limit:
+            entries = self.archive.query(limit - len(entries), trust_label, since, until, segments) + entries
+        return entries
+
+    def _open(self):
+        if self._log is None:
+            self._sync_index()
+            self._log = open(self.log_path, "ab")
+            self._log.seek(0, os.SEEK_END)
+            self._index = open(self.index_path, "ab")
+            index = read_index(self.index_path)
+            self._segment_day = self._day(index["timestamp"][0]) if len(index) else None
+
+    def _close_files(self):
+        for f in (self._log, self._index):
+            if f:
+                f.close()
+        self._log = self._index = None
+
+    def _should_rotate(self, timestamp: float) -> bool:
+        if self.archive is None or self._log.tell() == 0:
+            return False
+        if self.max_bytes and self._log.tell() >= self.max_bytes:
+            return True
+        return bool(self.rotate_daily and self._segment_day is not None and self._day(timestamp) != self._segment_day)
+
+    def _rotate(self):
+        self.fsync()
+        self._close_files()
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+        base = os.path.splitext(os.path.basename(self.log_path))[0]
+        name = f"{base}.{stamp}.{len(self.archive.segments()) + 1:06d}"
+        self.archive.add(self.log_path, self.index_path, name)
+        self._segment_day = None
+
+    @staticmethod
+    def _day(timestamp: float) -> str:
+        return datetime.fromtimestamp(float(timestamp), tz=timezone.utc).strftime("%Y-%m-%d")
+
+    def _read_entries(self, selected: np.ndarray) -> List[Dict[str, Any]]:
+        entries = []
+        if not len(selected):
+            return entries
+        with open(self.log_path, "rb") as f:
+            # Contiguous index records are read with a single seek + read
+            for offset, length in contiguous_runs(selected):
+                f.seek(offset)
+                entries.extend(parse_block(f.read(length)))
+        return entries
+
+    def _sync_index(self):
+        """
+        Brings the sidecar index in line with the JSONL file, indexing any unindexed tail.
+        """
+        if not os.path.exists(self.log_path):
+            if os.path.exists(self.index_path):
+                os.remove(self.index_path)
+            return
+
+        log_size = os.path.getsize(self.log_path)
+        index = read_index(self.index_path)
+        indexed_end = int(index["offset"][-1] + index["length"][-1]) if len(index) else 0
+        if indexed_end > log_size:
+            # The log was replaced or truncated underneath the index
+            index, indexed_end = index[:0], 0
+
+        # Drop a partially written trailing record, then append entries for the unindexed tail
+        with open(self.index_path, "wb" if not len(index) else "r+b") as idx:
+            idx.truncate(len(index) * INDEX_DTYPE.itemsize)
+            if indexed_end == log_size:
+                return
+            idx.seek(0, os.SEEK_END)
+            with open(self.log_path, "rb") as log:
+                log.seek(indexed_end)
+                offset = indexed_end
+                records = []
+                for raw in log:
+                    if not raw.endswith(b"\n"):
+                        break
+                    records.append(index_record(raw, offset))
+                    offset += len(raw)
+            idx.write(np.array(records, dtype=INDEX_DTYPE).tobytes())
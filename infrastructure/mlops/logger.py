@@ -1,21 +1,42 @@
-import json
+import asyncio
 import logging
 import os
-import numpy as np
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+
+from infrastructure import encoding
+from infrastructure.mlops.audit_index import to_epoch
+from infrastructure.mlops.audit_store import AuditLogStore
+from infrastructure.mlops.writer import AuditLogWriter, AuditQueueFull
 
 class TrustLogger:
     """
     Handles MLOps-style audit logging.
     Every prediction and trust decision is stored with metadata for future auditing.
+
+    With `async_writes=True`, entries are handed to a background AuditLogWriter instead of
+    being appended synchronously; `writer_options` are passed through to it.
+    `rotate_bytes` / `rotate_daily` enable segment rotation into compressed archives.
     """
     
-    def __init__(self, log_dir: str = "data/logs"):
+    def __init__(self,
+                 log_dir: str = "data/logs",
+                 async_writes: bool = False,
+                 rotate_bytes: Optional[int] = None,
+                 rotate_daily: bool = False,
+                 archive_format: str = "gzip",
+                 **writer_options):
         self.log_dir = log_dir
         os.makedirs(log_dir, exist_ok=True)
         
         self.audit_file = os.path.join(log_dir, "audit_log.jsonl")
+        self.store = AuditLogStore(
+            self.audit_file,
+            max_bytes=rotate_bytes,
+            rotate_daily=rotate_daily,
+            archive_format=archive_format
+        )
+        self.writer = AuditLogWriter(self.store, **writer_options) if async_writes else None
         
         # Also setup standard logging
         logging.basicConfig(
@@ -27,38 +48,120 @@ class TrustLogger:
     def log_decision(self, 
                      input_features: Dict[str, float], 
                      prediction_report: Dict[str, Any],
-                     trust_report: Dict[str, Any]):
+                     trust_report: Dict[str, Any],
+                     timings: Dict[str, float] = None,
+                     assessment_id: Optional[str] = None):
         """
         Logs a single decision to a JSONL audit file.
         """
-        def npy_serializer(obj):
-            if isinstance(obj, np.integer):
-                return int(obj)
-            if isinstance(obj, np.floating):
-                return float(obj)
-            if isinstance(obj, np.ndarray):
-                return obj.tolist()
-            return str(obj)
+        self.log_decisions([input_features], [prediction_report], [trust_report], timings,
+                           [assessment_id] if assessment_id else None)
 
-        entry = {
-            "timestamp": datetime.utcnow().isoformat(),
-            "model_version": "v1.0.0-pilot",
-            "input": input_features,
-            "predictions": {k: v.tolist() if isinstance(v, np.ndarray) else v for k, v in prediction_report.items()},
-            "trust": trust_report
-        }
-        
-        with open(self.audit_file, "a") as f:
-            f.write(json.dumps(entry, default=npy_serializer) + "\n")
-            
-        self.logger.info(f"Logged trust decision: {trust_report['trust_label']} (Score: {trust_report['trust_score']})")
+    def log_decisions(self,
+                      input_features: List[Dict[str, float]],
+                      prediction_reports: List[Dict[str, Any]],
+                      trust_reports: List[Dict[str, Any]],
+                      timings: Dict[str, float] = None,
+                      assessment_ids: Optional[List[str]] = None):
+        """
+        Logs a batch of decisions with a single append to the JSONL audit file.
+        `timings` is the request's per-stage latency breakdown (ms), shared by every entry.
+        `assessment_ids` (one per decision) link entries to later ground-truth feedback.
+        Prediction values may be numpy arrays or scalars; they are encoded as JSON lists/numbers.
+        """
+        records = self._records(input_features, prediction_reports, trust_reports, timings, assessment_ids)
+        if self.writer:
+            self.writer.write(records)
+        else:
+            self.store.append(records)
+        self._announce(trust_reports)
+
+    async def log_decisions_async(self,
+                                  input_features: List[Dict[str, float]],
+                                  prediction_reports: List[Dict[str, Any]],
+                                  trust_reports: List[Dict[str, Any]],
+                                  timings: Dict[str, float] = None,
+                                  assessment_ids: Optional[List[str]] = None):
+        """
+        log_decisions for the event loop: with a background writer, a full queue is waited
+        on in a thread (backpressure without stalling other requests). Raises AuditQueueFull
+        if it stays full for the writer's `put_timeout`.
+        """
+        records = self._records(input_features, prediction_reports, trust_reports, timings, assessment_ids)
+        if self.writer:
+            try:
+                self.writer.write(records, block=False)
+            except AuditQueueFull:
+                await asyncio.get_running_loop().run_in_executor(None, self.writer.write, records)
+        else:
+            self.store.append(records)
+        self._announce(trust_reports)
+
+    def _records(self,
+                 input_features: List[Dict[str, float]],
+                 prediction_reports: List[Dict[str, Any]],
+                 trust_reports: List[Dict[str, Any]],
+                 timings: Dict[str, float] = None,
+                 assessment_ids: Optional[List[str]] = None):
+        now = datetime.utcnow()
+        timestamp, epoch = now.isoformat(), to_epoch(now)
+        records = []
+        for i, (features, prediction_report, trust_report) in enumerate(zip(input_features, prediction_reports, trust_reports)):
+            entry = {
+                "timestamp": timestamp,
+                "model_version": "v1.0.0-pilot",
+                "input": features,
+                "predictions": prediction_report,
+                "trust": trust_report
+            }
+            if assessment_ids:
+                entry["assessment_id"] = assessment_ids[i]
+            if timings:
+                entry["timings_ms"] = timings
+            # Shared numpy-aware encoder (same one that renders API responses)
+            line = encoding.dumps_line(entry)
+            records.append((line, epoch, trust_report['trust_label']))
+        return records
+
+    def _announce(self, trust_reports: List[Dict[str, Any]]):
+        if len(trust_reports) == 1:
+            trust_report = trust_reports[0]
+            self.logger.info(f"Logged trust decision: {trust_report['trust_label']} (Score: {trust_report['trust_score']})")
+        else:
+            self.logger.info(f"Logged {len(trust_reports)} trust decisions.")
+
+    def flush(self):
+        """
+        Waits until every queued entry is on disk (no-op for synchronous logging).
+        """
+        if self.writer:
+            self.writer.flush()
+
+    def close(self):
+        """
+        Flushes pending entries and stops the background writer.
+        """
+        if self.writer:
+            self.writer.close()
+        self.store.close()
 
     def get_recent_logs(self, limit: int = 10):
-        if not os.path.exists(self.audit_file):
-            return []
-        
-        logs = []
-        with open(self.audit_file, "r") as f:
-            for line in f:
-                logs.append(json.loads(line))
-        return logs[-limit:]
+        return self.query_logs(limit)
+
+    def query_logs(self,
+                   limit: int = 10,
+                   trust_label: Optional[str] = None,
+                   since: Optional[datetime] = None,
+                   until: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """
+        Returns the most recent `limit` entries (oldest first), optionally filtered by trust
+        label and an inclusive UTC timestamp range. Served from the sidecar offset index,
+        so only the returned lines are read and parsed.
+        """
+        self.flush()
+        return self.store.query(
+            limit,
+            trust_label=trust_label,
+            since=to_epoch(since) if since else None,
+            until=to_epoch(until) if until else None
+        )
@@ -0,0 +1,157 @@
+import logging
+import queue
+import threading
+import time
+from typing import List
+
+from infrastructure.mlops.audit_index import AuditRecord
+from infrastructure.mlops.audit_store import AuditLogStore
+
+class AuditQueueFull(RuntimeError):
+    """
+    The audit queue had no room for a write; the caller should shed load.
+    """
+
+class AuditLogWriter:
+    """
+    Background writer for the JSONL audit trail.
+
+    Requests only enqueue pre-serialized records; a dedicated thread drains the bounded
+    queue, groups pending entries into a single store append and fsyncs according to the
+    configured policy. When the queue is full, producers block for up to `put_timeout`
+    seconds (backpressure) before the write is rejected with AuditQueueFull; `block=False`
+    rejects immediately instead, for callers that must not block (the event loop).
+
+    If a grouped append fails, its entries are logged as an error and counted in `dropped`,
+    the thread keeps running and the error is raised by the next flush().
+    """
+
+    FSYNC_POLICIES = ("always", "interval", "never")
+    _STOP = object()
+
+    def __init__(self,
+                 store: AuditLogStore,
+                 max_queue: int = 10000,
+                 batch_size: int = 512,
+                 fsync: str = "interval",
+                 fsync_interval: float = 1.0,
+                 put_timeout: float = 5.0):
+        if fsync not in self.FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy '{fsync}'. Expected one of {self.FSYNC_POLICIES}.")
+
+        self.store = store
+        self.batch_size = batch_size
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.put_timeout = put_timeout
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._last_fsync = time.monotonic()
+        self._closed = False
+        self._error = None
+
+        # Metrics
+        self.dropped = 0
+
+        self._thread = threading.Thread(target=self._run, name="trustscope-audit-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, records: List[AuditRecord], block: bool = True):
+        """
+        Enqueues serialized audit records (JSONL line, timestamp, label) as one group.
+        """
+        if self._closed:
+            raise RuntimeError("Audit log writer is closed.")
+        self._check_alive()
+        try:
+            if block:
+                self._queue.put(records, timeout=self.put_timeout)
+            else:
+                self._queue.put_nowait(records)
+        except queue.Full:
+            waited = f" for {self.put_timeout}s" if block else ""
+            raise AuditQueueFull(f"Audit log queue full{waited}; rejecting write to preserve the audit trail.")
+
+    def flush(self):
+        """
+        Blocks until every entry enqueued so far has been written. Raises (once) if a write
+        failed since the previous flush.
+        """
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                self._check_alive()
+                self._queue.all_tasks_done.wait(0.5)
+        error, self._error = self._error, None
+        if error is not None:
+            raise RuntimeError(f"Audit log writer failed: {error}")
+
+    def close(self):
+        """
+        Drains the queue, fsyncs and stops the writer thread.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        if not self._thread.is_alive():
+            logging.getLogger("TrustScope").error(
+                f"Audit log writer thread is not running; {self.pending} queued write(s) were not written.")
+            return
+        self._queue.put(self._STOP)
+        self._thread.join()
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def _run(self):
+        dirty = False
+        stopping = False
+        while not stopping:
+            try:
+                groups = [self._queue.get(timeout=self.fsync_interval)]
+            except queue.Empty:
+                # Idle: make sure the last grouped write reaches disk
+                if dirty and self.fsync != "never":
+                    self._fsync()
+                    dirty = False
+                continue
+
+            # Group whatever else is already waiting into the same write
+            while len(groups) < self.batch_size:
+                try:
+                    groups.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stopping = any(group is self._STOP for group in groups)
+            records = [record for group in groups if group is not self._STOP for record in group]
+            try:
+                self.store.append(records)
+                dirty = True
+                if stopping or self.fsync == "always" or (
+                    self.fsync == "interval" and time.monotonic() - self._last_fsync >= self.fsync_interval
+                ):
+                    self._fsync()
+                    dirty = False
+            except Exception as e:
+                # Keep the thread alive: later writes (and flush/close) must still be served
+                self._error = e
+                self.dropped += len(records)
+                logging.getLogger("TrustScope").error(
+                    f"Audit log write failed; dropped {len(records)} entries: {type(e).__name__}: {e}")
+            finally:
+                for _ in groups:
+                    self._queue.task_done()
+
+    def _check_alive(self):
+        if not self._thread.is_alive():
+            raise RuntimeError("Audit log writer thread is not running.")
+
+    def _fsync(self):
+        # Written entries stay written; a failed fsync is reported by the next flush()
+        try:
+            self.store.fsync()
+        except Exception as e:
+            self._error = e
+            logging.getLogger("TrustScope").error(f"Audit log fsync failed: {type(e).__name__}: {e}")
+        self._last_fsync = time.monotonic()
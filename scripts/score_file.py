@@ -0,0 +1,171 @@
+"""
+Bulk trust scoring: streams a CSV or Parquet file through the trust pipeline and writes the
+scores, labels and signals as Parquet part files.
+
+    python scripts/score_file.py data/history.csv data/history_scores --chunksize 20000 --workers 8
+
+The input is read in chunks and fanned out to worker processes (the same workers the API
+uses in process mode); each worker writes its chunk to OUTPUT_DIR/part-NNNNNN.parquet. At
+most two chunks per worker are in flight, so memory stays constant whatever the file size.
+Part files appear atomically, so an interrupted run resumes by rerunning the same command:
+finished chunks are skipped. `row_index` (plus any --id-columns) joins results back to the input.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+
+# Add current dir to path
+sys.path.append(os.getcwd())
+
+from core.data_science.streaming import read_chunks
+from infrastructure.api import workers
+from infrastructure.api.workers import InferencePool
+from infrastructure.config import settings
+
+CHECKPOINT = "_checkpoint.json"
+
+def _part_path(output_dir: str, chunk_index: int) -> str:
+    return os.path.join(output_dir, f"part-{chunk_index:06d}.parquet")
+
+def _score_chunk(chunk_index, X_input, ids, row_start, output_dir, mc_samples, mc_tolerance):
+    # Runs in a worker process (pipeline loaded by workers._init_worker)
+    import pandas as pd
+
+    started = time.perf_counter()
+    batch = workers._pipeline.assess_batch(X_input, num_samples=mc_samples, mc_tolerance=mc_tolerance)
+    table = pd.DataFrame({"row_index": range(row_start, row_start + len(X_input)), **ids, **batch.to_columns()})
+
+    path = _part_path(output_dir, chunk_index)
+    table.to_parquet(path + ".tmp", index=False)
+    os.replace(path + ".tmp", path)
+    return chunk_index, len(table), (time.perf_counter() - started) * 1000.0
+
+def _load_checkpoint(output_dir: str, run: dict, overwrite: bool):
+    """
+    Records the run parameters; refuses to resume a run made with different ones.
+    """
+    path = os.path.join(output_dir, CHECKPOINT)
+    if os.path.exists(path) and not overwrite:
+        with open(path) as f:
+            previous = json.load(f)
+        if previous != run:
+            changed = sorted(k for k in run if previous.get(k) != run[k])
+            raise SystemExit(f"[BulkScore] {output_dir} holds a run with different {changed}; "
+                             f"use another output directory or --overwrite.")
+    elif overwrite:
+        for name in os.listdir(output_dir):
+            if name.startswith("part-") or name == "_SUCCESS":
+                os.remove(os.path.join(output_dir, name))
+    with open(path, "w") as f:
+        json.dump(run, f, indent=2)
+
+def score_file(input_path: str,
+               output_dir: str,
+               chunksize: int = 10000,
+               workers_count: int = None,
+               torch_threads: int = 1,
+               mc_samples: int = 50,
+               mc_tolerance: float = None,
+               id_columns=(),
+               profiler_path: str = settings.PROFILER_PATH,
+               model_dir: str = settings.MODEL_DIR,
+               backend: str = settings.INFERENCE_BACKEND,
+               ood_method: str = None,
+               overwrite: bool = False):
+    os.makedirs(output_dir, exist_ok=True)
+    pool = InferencePool(mode="process", workers=workers_count, torch_threads=torch_threads,
+                         profiler_path=profiler_path, model_dir=model_dir,
+                         backend=backend, ood_method=ood_method)
+    try:
+        info = pool.warm_up()
+        feature_names = info["feature_names"]
+        stat = os.stat(input_path)
+        _load_checkpoint(output_dir, {
+            "input": os.path.abspath(input_path),
+            "input_size": stat.st_size,
+            "input_mtime": stat.st_mtime,
+            "chunksize": chunksize,
+            "mc_samples": mc_samples,
+            "mc_tolerance": mc_tolerance,
+            "id_columns": list(id_columns),
+            "model_version": info["model_version"],
+            "profiler_version": info["profiler_version"]
+        }, overwrite)
+
+        print(f"[BulkScore] Scoring {input_path} -> {output_dir} ({pool.workers} workers, chunks of {chunksize}).")
+        started = time.perf_counter()
+        in_flight = deque()
+        rows = skipped = 0
+
+        def collect():
+            nonlocal rows
+            chunk_index, num_rows, ms = in_flight.popleft().result()
+            rows += num_rows
+            elapsed = time.perf_counter() - started
+            print(f"[BulkScore] chunk {chunk_index}: {num_rows} rows in {ms:.0f} ms ({rows / elapsed:.0f} rows/s overall)")
+
+        row_start = 0
+        columns = list(dict.fromkeys([*feature_names, *id_columns]))
+        for chunk_index, chunk in enumerate(read_chunks(input_path, chunksize, columns)):
+            if os.path.exists(_part_path(output_dir, chunk_index)):
+                skipped += 1
+            else:
+                X_input = chunk[feature_names].to_numpy(dtype=float)
+                ids = {name: chunk[name].to_numpy() for name in id_columns}
+                in_flight.append(pool.executor.submit(
+                    _score_chunk, chunk_index, X_input, ids, row_start, output_dir, mc_samples, mc_tolerance))
+                # Bounded queue: the reader never gets more than two chunks per worker ahead
+                while len(in_flight) >= 2 * pool.workers:
+                    collect()
+            row_start += len(chunk)
+        while in_flight:
+            collect()
+
+        seconds = round(time.perf_counter() - started, 2)
+        summary = {"rows_scored": rows, "total_rows": row_start, "chunks_skipped": skipped, "seconds": seconds}
+        with open(os.path.join(output_dir, "_SUCCESS"), "w") as f:
+            json.dump(summary, f)
+        print(f"[BulkScore] Done: {summary}")
+        return summary
+    finally:
+        pool.shutdown()
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk trust scoring of a CSV/Parquet file into Parquet part files.")
+    parser.add_argument("input", help="CSV or .parquet file with (at least) the profiler's feature columns")
+    parser.add_argument("output_dir", help="Directory for part-NNNNNN.parquet files and the resume checkpoint")
+    parser.add_argument("--chunksize", type=int, default=10000)
+    parser.add_argument("--workers", type=int, default=settings.INFERENCE_WORKERS or None,
+                        help="Worker processes (default: one per core / torch threads)")
+    parser.add_argument("--torch-threads", type=int, default=settings.TORCH_THREADS)
+    parser.add_argument("--mc-samples", type=int, default=50)
+    parser.add_argument("--mc-tolerance", type=float, default=None)
+    parser.add_argument("--id-columns", default="", help="Comma-separated input columns copied to the output")
+    parser.add_argument("--profiler-path", default=settings.PROFILER_PATH)
+    parser.add_argument("--model-dir", default=settings.MODEL_DIR)
+    parser.add_argument("--backend", default=settings.INFERENCE_BACKEND)
+    parser.add_argument("--ood-method", default=settings.OOD_METHOD or None)
+    parser.add_argument("--overwrite", action="store_true", help="Discard previous results instead of resuming")
+    args = parser.parse_args()
+
+    score_file(
+        args.input,
+        args.output_dir,
+        chunksize=args.chunksize,
+        workers_count=args.workers,
+        torch_threads=args.torch_threads,
+        mc_samples=args.mc_samples,
+        mc_tolerance=args.mc_tolerance,
+        id_columns=[c for c in args.id_columns.split(",") if c],
+        profiler_path=args.profiler_path,
+        model_dir=args.model_dir,
+        backend=args.backend,
+        ood_method=args.ood_method,
+        overwrite=args.overwrite
+    )
+
+if __name__ == "__main__":
+    main()
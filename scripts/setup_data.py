@@ -3,7 +3,6 @@ from sklearn.datasets import load_breast_cancer
 from sklearn.model_selection import train_test_split
 from core.data_science.profiler import DataProfiler
 from core.modeling.models import TrustModelManager
-import joblib
 import os
 
 def setup():
@@ -16,8 +15,9 @@ def setup():
 
     # 1. Fit Data Profiler
     profiler = DataProfiler()
-    profiler.fit_distribution(X_train)
-    joblib.dump(profiler, "data/profiler.joblib")
+    profiler.fit_distribution(X_train, knn_index=True)
+    # kNN index is written next to it (data/profiler.knn); the default OOD method is unchanged
+    profiler.save("data/profiler.joblib")
 
     # 2. Train Models
     manager = TrustModelManager(input_dim=X_train.shape[1])
@@ -9,6 +9,7 @@ sys.path.append(os.getcwd())
 
 from core.data_science.profiler import DataProfiler
 from core.modeling.models import TrustModelManager
+from core.modeling.inference import InferenceContext
 from core.uncertainty.estimator import UncertaintyEstimator
 from core.trust.engine import TrustScoreEngine
 from core.explain.explainer import TrustExplainer
@@ -33,13 +34,15 @@ def run_test():
     x_input = np.array([[test_features[f] for f in profiler.feature_names]])
     
     print("[SmokeTest] Running assessment for In-Distribution sample...")
-    raw_preds = manager.predict_all(x_input)
-    uncertainty = uncertainty_estimator.estimate_total_uncertainty(x_input, test_features)
+    context = InferenceContext(manager, x_input)
+    raw_preds = context.predictions
+    uncertainty = uncertainty_estimator.estimate_total_uncertainty(x_input, test_features, context)
     trust = trust_engine.compute_trust_score(raw_preds, uncertainty)
     explanation = explainer.synthesize_explanation(trust)
     
     print(f"Result: {trust['trust_label']} (Score: {trust['trust_score']})")
     print(f"Explanation: {explanation}")
+    print(f"Timings (ms): {context.timings} | Ensemble passes: {context.ensemble_passes}")
     
     # 5. Create OOD sample (Extreme noise)
     print("\n[SmokeTest] Running assessment for Out-of-Distribution sample...")
@@ -59,5 +62,18 @@ def run_test():
     else:
         print("\n[SmokeTest] FAILURE: OOD sample marked as SAFE.")
 
+    # 6. Batch path (both samples in one pass)
+    print("\n[SmokeTest] Running batch assessment for both samples...")
+    x_batch = np.vstack([x_input, x_ood])
+    uncertainty_batch = uncertainty_estimator.estimate_total_uncertainty_batch(x_batch)
+    trust_batch = trust_engine.compute_trust_scores_batch(uncertainty_batch)
+    print(f"Results: {[t['trust_label'] for t in trust_batch]}")
+
+    batch_similarity = uncertainty_estimator.uncertainty_row(uncertainty_batch, 1)['data_similarity']
+    if batch_similarity == uncertainty_ood['data_similarity']:
+        print("[SmokeTest] SUCCESS: Batch signals match single-row path.")
+    else:
+        print("[SmokeTest] FAILURE: Batch signals diverge from single-row path.")
+
 if __name__ == "__main__":
     run_test()
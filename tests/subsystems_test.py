@@ -0,0 +1,179 @@
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+# Add current dir to path
+sys.path.append(os.getcwd())
+
+from infrastructure.api.cache import AssessmentCache
+from infrastructure.mlops.audit_store import AuditLogStore
+from infrastructure.mlops.logger import TrustLogger
+
+LABELS = ("SAFE", "REVIEW", "UNSAFE")
+failures = []
+
+def check(condition: bool, message: str):
+    if condition:
+        print(f"[SubsystemTest] SUCCESS: {message}")
+    else:
+        print(f"[SubsystemTest] FAILURE: {message}")
+        failures.append(message)
+
+def log_entries(logger: TrustLogger, start: int, count: int):
+    for i in range(start, start + count):
+        trust = {"trust_label": LABELS[i % 3], "trust_score": float(i)}
+        logger.log_decision({"row": i}, {"rf": 0.5}, trust)
+
+def rows(entries):
+    return [entry["input"]["row"] for entry in entries]
+
+def check_index_rebuild(log_dir: str):
+    print("[SubsystemTest] Audit index rebuild...")
+    logger = TrustLogger(log_dir)
+    log_entries(logger, 0, 30)
+    expected = rows(logger.query_logs(100))
+    logger.close()
+    check(expected == list(range(30)), "recent-N query returns every entry in order")
+
+    index_path = os.path.join(log_dir, "audit_log.jsonl.idx")
+    os.remove(index_path)
+    store = AuditLogStore(os.path.join(log_dir, "audit_log.jsonl"))
+    check(rows(store.query(100)) == expected, "missing sidecar index is rebuilt from the JSONL file")
+    check(rows(store.query(100, trust_label="SAFE")) == list(range(0, 30, 3)), "label filter after rebuild")
+
+    # A torn trailing index record plus lines appended by a writer that did not index them
+    with open(index_path, "ab") as f:
+        f.write(b"\x00" * 5)
+    with open(os.path.join(log_dir, "audit_log.jsonl"), "ab") as f:
+        f.write(json.dumps({"timestamp": "2026-01-01T00:00:00", "input": {"row": 30},
+                            "trust": {"trust_label": "SAFE", "trust_score": 1.0}}).encode() + b"\n")
+    store = AuditLogStore(os.path.join(log_dir, "audit_log.jsonl"))
+    check(rows(store.query(100)) == list(range(31)), "stale index is repaired and the unindexed tail indexed")
+    store.close()
+
+def check_rotation_and_query(log_dir: str):
+    print("[SubsystemTest] Audit rotation and cross-segment queries...")
+    logger = TrustLogger(log_dir, rotate_bytes=2000)
+    log_entries(logger, 0, 120)
+    logger.store.archive._executor.submit(lambda: None).result()  # wait for queued compactions
+
+    segments = logger.store.archive.segments()
+    check(len(segments) > 1, f"active file rotated into {len(segments)} archived segments")
+    check(all(s["format"] == "gzip" for s in segments), "archived segments are compacted")
+    check(rows(logger.query_logs(1000)) == list(range(120)), "query spans the archive and the active file without gaps or duplicates")
+    check(rows(logger.query_logs(25)) == list(range(95, 120)), "recent-N query across segments")
+    check(rows(logger.query_logs(1000, trust_label="UNSAFE")) == list(range(2, 120, 3)), "label filter across segments")
+    logger.close()
+
+def check_writer_errors(log_dir: str):
+    print("[SubsystemTest] Background writer error path...")
+    logger = TrustLogger(log_dir, async_writes=True, rotate_bytes=2000)
+    log_entries(logger, 0, 10)
+    logger.flush()
+
+    # A corrupt manifest makes every rotation fail inside the writer thread
+    manifest = os.path.join(log_dir, "archive", "manifest.json")
+    with open(manifest, "w") as f:
+        f.write("{corrupt")
+    log_entries(logger, 10, 40)
+    # In a helper thread, so a writer that died (and a flush that never returns) fails the check
+    outcome = []
+    def flush():
+        try:
+            logger.flush()
+            outcome.append(None)
+        except RuntimeError as e:
+            outcome.append(e)
+    flusher = threading.Thread(target=flush, daemon=True)
+    flusher.start()
+    flusher.join(timeout=10)
+    check(bool(outcome), "flush() returns after a failed write")
+    check(bool(outcome) and outcome[0] is not None, "flush() reports the failed write")
+    check(logger.writer._thread.is_alive(), "writer thread survives a non-OSError failure")
+    check(logger.writer.dropped > 0, f"dropped entries are counted ({logger.writer.dropped})")
+    if not outcome:
+        return  # The writer is stuck; closing it would hang too
+
+    os.remove(manifest)
+    log_entries(logger, 50, 5)
+    logger.flush()
+    check(rows(logger.query_logs(5)) == list(range(50, 55)), "writes recover and flush() no longer raises")
+    logger.close()
+
+def check_cache_invalidation():
+    print("[SubsystemTest] Assessment cache invalidation...")
+    cache = AssessmentCache(max_entries=2, ttl_seconds=60)
+    cache.set_versions("model-a", "profile-a")
+    x = np.arange(3.0)
+    key = cache.key(x, "deterministic")
+    cache.put(key, "cached")
+    check(cache.get(key) == "cached", "entry is served while versions are unchanged")
+    check(not cache.set_versions("model-a", "profile-a"), "same versions keep the cache")
+    check(cache.set_versions("model-b", "profile-a") and cache.get(key) is None, "a new model version drops every entry")
+    check(cache.key(x, "deterministic") != key, "keys include the artifact versions")
+
+    cache.put(cache.key(x, "a"), 1)
+    cache.put(cache.key(x, "b"), 2)
+    cache.put(cache.key(x, "c"), 3)
+    check(cache.get(cache.key(x, "a")) is None and cache.stats()["evictions"] == 1, "LRU bound evicts the oldest entry")
+
+    cache = AssessmentCache(ttl_seconds=0.01)
+    cache.put(key, "cached")
+    time.sleep(0.02)
+    check(cache.get(key) is None, "entries expire after the TTL")
+
+def check_forest_parity(model_dir: str):
+    print("[SubsystemTest] FlatForest parity and artifact versions...")
+    from benchmarks.synthetic import make_dataset
+    from core.modeling.forest import FlatForest
+    from core.modeling.models import TrustModelManager
+
+    X, y = make_dataset(num_features=12, num_rows=400)
+    manager = TrustModelManager(input_dim=12, model_dir=model_dir)
+    manager.train(X.values, y)
+    sklearn_forest = manager.rf_model
+
+    X_query, _ = make_dataset(num_features=12, num_rows=300, seed=1)
+    X_query = np.vstack([X_query.values, X_query.values * 10])
+    flat = FlatForest.load(os.path.join(model_dir, TrustModelManager.FOREST_DIR))
+    diff = np.abs(flat.predict_proba(X_query) - sklearn_forest.predict_proba(X_query)).max()
+    check(diff < 1e-9, f"FlatForest matches sklearn predict_proba (max abs diff {diff:.2e})")
+
+    loaded = TrustModelManager.from_dir(model_dir)
+    check(isinstance(loaded.rf_model, FlatForest), "serving manager loads the memory-mapped forest")
+    check(loaded.parity_report(X_query[:50])["rf_max_abs_diff"] < 1e-9, "parity_report agrees with the pickle")
+
+    version = TrustModelManager.artifact_version(model_dir)
+    time.sleep(0.01)
+    TrustModelManager.export_forest(model_dir)
+    check(TrustModelManager.artifact_version(model_dir) != version, "re-exporting the forest changes the artifact version")
+
+    try:
+        loaded.save_models()
+        saved = True
+    except Exception as e:
+        print(f"    save_models raised {type(e).__name__}: {e}")
+        saved = False
+    check(saved and TrustModelManager.from_dir(model_dir).parity_report(X_query[:50])["rf_max_abs_diff"] < 1e-9,
+          "save_models on a manager serving a FlatForest keeps the sklearn pickle")
+
+def run_test():
+    with tempfile.TemporaryDirectory(prefix="trustscope-test-") as root:
+        check_index_rebuild(os.path.join(root, "index"))
+        check_rotation_and_query(os.path.join(root, "rotation"))
+        check_writer_errors(os.path.join(root, "writer"))
+        check_cache_invalidation()
+        check_forest_parity(os.path.join(root, "models"))
+
+    if failures:
+        print(f"\n[SubsystemTest] {len(failures)} check(s) failed.")
+        sys.exit(1)
+    print("\n[SubsystemTest] All checks passed.")
+
+if __name__ == "__main__":
+    run_test()